@@ -1,33 +1,13 @@
+import asyncio
+import time
 import streamlit as st
-from langgraph.graph import StateGraph, END
 from langchain_community.document_loaders import PyPDFLoader, TextLoader
 
-from resume_score_agent import resume_skill_match_agent
-from email_agent import email_agent_node as email_agent
-
-
-from youtube_utility import youtube_utility
-
-
-# Define graph state class
-#class GraphState(dict): pass
-
-from langgraph.graph import StateGraph, END
-
-builder = StateGraph(dict)
-
-builder.add_node("resume_skill_match", resume_skill_match_agent)
-builder.add_node("youtube", youtube_utility)
-builder.add_node("email", email_agent)
-
-builder.set_entry_point("resume_skill_match")
-
-# Explicit edges showing how data flows
-builder.add_edge("resume_skill_match", "youtube")
-builder.add_edge("youtube", "email")
-builder.add_edge("email", END)
-
-graph = builder.compile()
+# Graph (Resume Skill Match → YouTube → Email) is built in pipeline.py
+from pipeline import run_pipeline
+from resume_sections import extract_pdf_headings
+from llm_scheduler import scheduler, request_context
+import run_store
 
 
 # Streamlit UI
@@ -52,26 +32,91 @@ def convert_to_text(uploaded_file):
         return PyPDFLoader(tmp_path).load()[0].page_content
     else:
         return uploaded_file.read().decode("utf-8")
+
+def convert_resume(uploaded_file):
+    """Resume text plus heading lines detected from the PDF layout (for section matching)."""
+    with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp:
+        tmp.write(uploaded_file.read())
+        tmp_path = tmp.name
+    resume_text = PyPDFLoader(tmp_path).load()[0].page_content
+    try:
+        headings = extract_pdf_headings(tmp_path, page_numbers=[0])
+    except Exception as e:
+        print(f"[WARN] Layout heading detection failed, using text cues only: {e}")
+        headings = []
+    return resume_text, headings
+
+def timed_stream(tokens, timings, key):
+    """Passes tokens through while recording time-to-first-token and total time."""
+    start = time.perf_counter()
+    for token in tokens:
+        if f"{key}_ttft" not in timings:
+            timings[f"{key}_ttft"] = time.perf_counter() - start
+        yield token
+    timings[f"{key}_total"] = time.perf_counter() - start
+
+def stream_section(title, tokens, timings, key):
+    """Renders a streamed LLM section; returns the full text, or None on failure."""
+    st.subheader(title)
+    try:
+        text = st.write_stream(timed_stream(tokens, timings, key))
+    except Exception as e:
+        st.warning(f"⚠️ Streaming failed, it will be regenerated for the email: {e}")
+        return None
+    if f"{key}_ttft" in timings:
+        st.caption(f"⏱️ First token: {timings[f'{key}_ttft']:.2f}s · Total: {timings[f'{key}_total']:.2f}s")
+    return text
+
+def show_section(title, text):
+    """Renders a cover letter or Q&A that was not streamed in this session (saved or shared run)."""
+    if text:
+        st.subheader(title)
+        st.write(text)
+
 if not uploaded_resume or not uploaded_jd or not user_email:
     st.info("👉 Please upload Resume, Job Description, and enter Email before running the pipeline.")
 button_disabled = not (uploaded_resume and uploaded_jd and user_email)
 if st.button("🚀 Run AI Agent Pipeline", disabled=button_disabled):
     st.info("Running Resume Skill Match → YouTube Suggestions → Email Agent...")
-    resume_text = convert_to_text(uploaded_resume)
+    resume_text, resume_headings = convert_resume(uploaded_resume)
     jd_text = convert_to_text(uploaded_jd)
 
-    from email_agent import extract_skills  # ✅ Add this import
-    job_skills = extract_skills(jd_text)    # ✅ Extract skills from JD
-
-    state = {
-        "resume_text": resume_text,
-        "jd_text": jd_text,
-        "job_skills": job_skills,
-        "user_email": user_email
-    }
+    from jd_profile import get_jd_profile
+    jd_profile = get_jd_profile(jd_text)    # ✅ Parsed once per JD, cached by content hash
+
+    # Stream the LLM documents first; the email attachments reuse the full text.
+    # A repeat submission (double click, refresh) is answered from the run store, and
+    # one that arrives while the same run is streaming waits for that run instead.
+    from email_agent import stream_cover_letter, stream_qa_guide
+    timings = {}
+    cover_letter = qa_guide = None
+    key = run_store.run_key(resume_text, jd_profile["jd_id"], user_email)
+    saved = run_store.get_result(key) is not None
+    in_flight = None if saved else run_store.claim_run(key)
+    if saved:
+        st.info("♻️ Same resume, job description and email as an earlier run — showing the saved results.")
+    elif in_flight is not None:
+        st.info("⏳ The same resume, job description and email are already being processed — waiting for that run.")
+    else:
+        try:
+            with request_context(tenant=user_email):
+                cover_letter = stream_section("✉️ Cover Letter", stream_cover_letter(resume_text, jd_profile), timings, "cover_letter")
+                qa_guide = stream_section("❓ Interview Q&A Guide", stream_qa_guide(resume_text, jd_profile), timings, "qa_guide")
+        except BaseException as e:
+            # Streamlit stops a script with BaseExceptions; waiters get a plain error
+            run_store.finish_run(key, error=e if isinstance(e, Exception) else RuntimeError("The identical run was interrupted."))
+            raise
 
     try:
-        output = graph.invoke(state)
+        if in_flight is not None:
+            output = in_flight.result()
+        else:
+            # Async nodes: one event loop can multiplex many pipelines' I/O
+            output = asyncio.run(run_pipeline(resume_text, jd_profile, user_email, cover_letter, qa_guide, resume_headings,
+                                              claimed=not saved))
+        if cover_letter is None and qa_guide is None:
+            show_section("✉️ Cover Letter", output.get("cover_letter"))
+            show_section("❓ Interview Q&A Guide", output.get("qa_guide"))
         st.subheader("✅ Final Agent Output:")
         if "score" in output:
             st.metric("📊 Resume Match Score", f"{output['score']:.2f}%")
@@ -87,3 +132,6 @@ if st.button("🚀 Run AI Agent Pipeline", disabled=button_disabled):
 
     except Exception as e:
         st.error(f"❌ Error: {e}")
+
+with st.sidebar.expander("📈 LLM queue metrics"):
+    st.json(scheduler.metrics())
@@ -0,0 +1,48 @@
+# Shared immutable document store: pipelines pass IDs around instead of texts
+import hashlib
+import threading
+from types import MappingProxyType
+
+_documents: dict = {}
+_refcounts: dict = {}
+_lock = threading.Lock()
+
+
+def content_id(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def put(value, doc_id=None, kind="text") -> str:
+    """Stores `value` (a str or dict) and returns its ID, "<kind>:<doc_id>".
+
+    `doc_id` defaults to the content hash. The kind keeps documents of different
+    types apart even when their keys match, e.g. a JD profile (kind="jd", keyed
+    by the JD text hash) and a resume with the same text as that JD.
+    Identical texts share one copy; every put must be paired with a release.
+    """
+    doc_id = f"{kind}:{content_id(value) if doc_id is None else doc_id}"
+    if isinstance(value, dict):
+        value = MappingProxyType(value)
+    with _lock:
+        if doc_id not in _documents:
+            _documents[doc_id] = value
+        _refcounts[doc_id] = _refcounts.get(doc_id, 0) + 1
+    return doc_id
+
+
+def get(doc_id):
+    if doc_id is None:
+        return None
+    return _documents[doc_id]
+
+
+def release(doc_id) -> None:
+    if doc_id is None:
+        return
+    with _lock:
+        count = _refcounts.get(doc_id, 0) - 1
+        if count <= 0:
+            _refcounts.pop(doc_id, None)
+            _documents.pop(doc_id, None)
+        else:
+            _refcounts[doc_id] = count
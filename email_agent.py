@@ -1,7 +1,11 @@
 import re
 import os
 import uuid
-import smtplib
+import asyncio
+import aiosmtplib
+import document_store
+import run_store
+from llm_scheduler import scheduler
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 from email.mime.base import MIMEBase
@@ -10,14 +14,21 @@ from reportlab.lib.pagesizes import letter
 from reportlab.pdfgen import canvas
 from dotenv import load_dotenv
 from langchain_core.messages import HumanMessage
-from langchain_groq import ChatGroq
+import providers
 import streamlit as st  # Optional, for error display in Streamlit apps
 
 # Load environment variables
 load_dotenv()
 
 # ✅ Initialize Groq LLM (agent-specific)
-llm = ChatGroq(api_key=os.getenv("GROQ_API_KEY"), model="llama-3.3-70b-versatile")
+LLM_MODEL = "llama-3.3-70b-versatile"
+llm = providers.get_chat_llm(LLM_MODEL)
+
+def set_llm(new_llm):
+    """Swaps the chat model every call below uses (e.g. a fake in tests); returns the previous one."""
+    global llm
+    previous, llm = llm, new_llm
+    return previous
 
 # ------------------------ Extracting Info ------------------------
 
@@ -29,25 +40,29 @@ def extract_candidate_name(text):
             return name_match.group(1).strip()
     return "Candidate"
 
+SKILLS_KEYWORDS = [
+    "Python", "Machine Learning", "Deep Learning", "SQL", "NLP", "Computer Vision",
+    "Data Analysis", "Java", "C++", "HTML", "CSS", "JavaScript"
+]
+
 def extract_skills(text):
-    skills_keywords = [
-        "Python", "Machine Learning", "Deep Learning", "SQL", "NLP", "Computer Vision",
-        "Data Analysis", "Java", "C++", "HTML", "CSS", "JavaScript"
-    ]
-    return [skill for skill in skills_keywords if skill.lower() in text.lower()]
+    return [skill for skill in SKILLS_KEYWORDS if skill.lower() in text.lower()]
 
 # ------------------------ PDF + LLM Utilities ------------------------
 
-def generate_cover_letter(resume_text, jd_text):
-    prompt = f"""
+def cover_letter_prompt(resume_text, jd_profile):
+    return f"""
         You are an expert resume writer.
         Generate a concise and formal **cover letter** for the candidate using the following inputs:
         ---
         **Resume:**
         {resume_text}
         ---
-        **Job Description:**
-        {jd_text}
+        **Job Description (summary):**
+        {jd_profile["summary"]}
+        ---
+        **Role:** {jd_profile.get("title") or "Not specified"}
+        **Company:** {jd_profile.get("company") or "Not specified"}
         ---
 Instructions:
 - Start with the candidate’s name, city, phone number, and email at the top.
@@ -63,9 +78,8 @@ Instructions:
 - Avoid unnecessary filler or generic phrases.
 - Return only the clean, formatted letter — no explanations or extra notes.
         """
-    return llm.invoke([HumanMessage(content=prompt)]).content
-def generate_qa_guide(resume_text, jd_text):
-    prompt = f"""
+def qa_guide_prompt(resume_text, jd_profile):
+    return f"""
 You are a technical recruiter and career coach.
 
 Step 1️⃣ Identify the top 3–4 technical domains or skill‑clusters mentioned in the resume or job description.
@@ -78,8 +92,10 @@ Step 3️⃣ Add behavioral or situational questions so that there are 10–12 q
 **Resume Text:**
 {resume_text}
 
-**Job Description Text:**
-{jd_text}
+**Job Description (summary):**
+{jd_profile["summary"]}
+
+**Required Skills:** {", ".join(jd_profile["skills"]) or "Not specified"}
 
 **Instructions:**
 - Use this exact numbering format:
@@ -91,7 +107,27 @@ Step 3️⃣ Add behavioral or situational questions so that there are 10–12 q
 - Ensure each answer is 2–4 lines and clearly tailored to the candidate’s experience.
 - Return only the numbered Q&A pairs, no extra headings or commentary.
 """
-    return llm.invoke([HumanMessage(content=prompt)]).content
+
+# All LLM calls go through the scheduler (per-model limits, tenant fairness, priorities)
+async def ainvoke_llm(prompt):
+    async with scheduler.slot(LLM_MODEL):
+        return (await llm.ainvoke([HumanMessage(content=prompt)])).content
+
+# Streaming variants: yield tokens as they arrive so the UI can render progressively
+def stream_llm(prompt):
+    with scheduler.slot_sync(LLM_MODEL):
+        for chunk in llm.stream([HumanMessage(content=prompt)]):
+            if chunk.content:
+                yield chunk.content
+def stream_cover_letter(resume_text, jd_profile):
+    return stream_llm(cover_letter_prompt(resume_text, jd_profile))
+def stream_qa_guide(resume_text, jd_profile):
+    return stream_llm(qa_guide_prompt(resume_text, jd_profile))
+
+async def agenerate_cover_letter(resume_text, jd_profile):
+    return await ainvoke_llm(cover_letter_prompt(resume_text, jd_profile))
+async def agenerate_qa_guide(resume_text, jd_profile):
+    return await ainvoke_llm(qa_guide_prompt(resume_text, jd_profile))
 
 from reportlab.lib.pagesizes import letter
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
@@ -136,13 +172,18 @@ def save_text_to_pdf(text, filename):
 
 # ------------------------ Email Utilities ------------------------
 
-def send_email_with_attachments(to_email, subject, body, attachments):
+def get_email_credentials(smtp):
     from_email = os.getenv("EMAIL_USER")
     from_password = os.getenv("EMAIL_PASS")
 
+    # A local sink (offline mode) accepts mail without logging in
+    if not smtp["auth"]:
+        return from_email or "ai-job-agent@localhost", None
     if not from_email or not from_password:
         raise ValueError("Email credentials are missing in environment variables.")
+    return from_email, from_password
 
+def build_email_message(from_email, to_email, subject, body, attachments):
     message = MIMEMultipart()
     message['From'] = from_email
     message['To'] = to_email
@@ -159,11 +200,21 @@ def send_email_with_attachments(to_email, subject, body, attachments):
                 f"attachment; filename= {os.path.basename(filepath)}",
             )
             message.attach(part)
+    return message
 
-    with smtplib.SMTP("smtp.gmail.com", 587) as server:
-        server.starttls()
-        server.login(from_email, from_password)
-        server.send_message(message)
+async def asend_email_with_attachments(to_email, subject, body, attachments):
+    smtp = providers.smtp_settings()
+    from_email, from_password = get_email_credentials(smtp)
+    message = build_email_message(from_email, to_email, subject, body, attachments)
+
+    await aiosmtplib.send(
+        message,
+        hostname=smtp["host"],
+        port=smtp["port"],
+        start_tls=smtp["starttls"],
+        username=from_email if smtp["auth"] else None,
+        password=from_password,
+    )
 
 # ------------------------ Main Agent ------------------------
 
@@ -171,22 +222,7 @@ def clean_text_for_pdf(text):
     lines = text.strip().split('\n')
     cleaned_lines = [line.strip() for line in lines if line.strip()]
     return '\n'.join(cleaned_lines)
-def email_agent(resume_text, jd_text, user_email):
-    candidate_name = extract_candidate_name(resume_text)
-    candidate_skills = extract_skills(resume_text)
-
-    try:
-        cover_letter = generate_cover_letter(resume_text, jd_text)
-    except Exception as e:
-        print(f"[ERROR] Cover Letter Generation Failed: {e}")
-        cover_letter = "Unable to generate cover letter at this time."
-
-    try:
-        qa_guide = generate_qa_guide(resume_text, jd_text)
-    except Exception as e:
-        print(f"[ERROR] Q&A Generation Failed: {e}")
-        qa_guide = "Unable to generate Q&A at this time."
-
+def render_attachments(cover_letter, qa_guide):
     cl_file = f"cover_letter_{uuid.uuid4().hex[:6]}.pdf"
     qa_file = f"qa_guide_{uuid.uuid4().hex[:6]}.pdf"
 
@@ -195,19 +231,80 @@ def email_agent(resume_text, jd_text, user_email):
 
     save_text_to_pdf(clean_cl, cl_file)
     save_text_to_pdf(clean_qa, qa_file)
+    return cl_file, qa_file
 
+def email_subject_and_body(candidate_name):
     subject = "📄 Your Personalized Cover Letter & Interview Guide"
     body = f"Hi {candidate_name},\n\nAttached are your AI-generated cover letter and interview Q&A guide.\n\nGood luck with your application!\n\nRegards,\nAI Job Agent"
+    return subject, body
+
+async def _use_or_generate(text, generate, resume_text, jd_profile):
+    if text is not None:
+        return text
+    return await generate(resume_text, jd_profile)
+
+async def email_agent_async(resume_text, jd_profile, user_email, cover_letter=None, qa_guide=None):
+    """Generates whichever documents were not passed in and emails both.
+
+    Returns (sent, cover_letter, qa_guide); a text is None if its generation
+    failed, and then nothing is sent, so a retry can produce the real documents.
+    """
+    candidate_name = extract_candidate_name(resume_text)
+
+    # Both generations are independent, so run them concurrently
+    cover_letter, qa_guide = await asyncio.gather(
+        _use_or_generate(cover_letter, agenerate_cover_letter, resume_text, jd_profile),
+        _use_or_generate(qa_guide, agenerate_qa_guide, resume_text, jd_profile),
+        return_exceptions=True,
+    )
+    if isinstance(cover_letter, Exception):
+        print(f"[ERROR] Cover Letter Generation Failed: {cover_letter}")
+        cover_letter = None
+    if isinstance(qa_guide, Exception):
+        print(f"[ERROR] Q&A Generation Failed: {qa_guide}")
+        qa_guide = None
+    if cover_letter is None or qa_guide is None:
+        print(f"[ERROR] Email to {user_email} not sent: documents could not be generated.")
+        return False, cover_letter, qa_guide
+
+    # PDF rendering is CPU-bound, keep it off the event loop
+    cl_file, qa_file = await asyncio.to_thread(render_attachments, cover_letter, qa_guide)
+    subject, body = email_subject_and_body(candidate_name)
 
     try:
-        send_email_with_attachments(user_email, subject, body, [cl_file, qa_file])
+        await asend_email_with_attachments(user_email, subject, body, [cl_file, qa_file])
         print(f"[SUCCESS] Email sent to {user_email} with generated documents.")
+        return True, cover_letter, qa_guide
     except Exception as e:
         print(f"[ERROR] Failed to send email: {e}")
-def email_agent_node(state):
-    resume_text = state["resume_text"]
-    jd_text = state["jd_text"]
-    user_email = state["user_email"]
-    email_agent(resume_text, jd_text, user_email)
-    return state  # return unchanged or modified state as needed
+        return False, cover_letter, qa_guide
+async def email_agent_node_async(state):
+    key = state.get("run_key")
+    if key and not await asyncio.to_thread(run_store.claim_email, key):
+        print(f"[INFO] Duplicate submission, email to {state['user_email']} suppressed.")
+        return {"email_sent": False}
 
+    # Whatever goes wrong before the mail is out, the claim must not lock out a retry
+    try:
+        sent, cover_letter, qa_guide = await email_agent_async(
+            document_store.get(state["resume_id"]), document_store.get(state["jd_id"]), state["user_email"],
+            document_store.get(state.get("cover_letter_id")), document_store.get(state.get("qa_guide_id")),
+        )
+    except BaseException:
+        if key:
+            await asyncio.to_thread(run_store.release_email_claim, key)
+        raise
+    if key and not sent:
+        await asyncio.to_thread(run_store.release_email_claim, key)
+
+    delta = {"email_sent": sent}  # delta only
+    # Texts generated here go back to the run, which shows and stores them
+    if cover_letter is not None and state.get("cover_letter_id") is None:
+        delta["cover_letter_id"] = document_store.put(cover_letter)
+    if qa_guide is not None and state.get("qa_guide_id") is None:
+        delta["qa_guide_id"] = document_store.put(qa_guide)
+    return delta
+
+# Sync entry point for callers outside an event loop
+def email_agent_node(state):
+    return asyncio.run(email_agent_node_async(state))
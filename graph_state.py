@@ -0,0 +1,35 @@
+# Typed graph state: nodes return only the keys they change (deltas)
+from typing import TypedDict, List, Optional, Annotated
+
+
+def merge_timings(left: dict, right: dict) -> dict:
+    """Reducer for per-node timings: each node adds its own entry."""
+    return {**(left or {}), **(right or {})}
+
+
+class PipelineState(TypedDict, total=False):
+    # run_store key of (resume, JD, email); used for email dedup
+    run_key: str
+
+    # Inputs — large texts live in document_store, the state only holds their IDs
+    resume_id: str
+    jd_id: str
+    user_email: str
+    resume_headings: List[str]  # layout headings, see resume_sections
+    cover_letter_id: Optional[str]
+    qa_guide_id: Optional[str]
+
+    # resume_skill_match
+    score: float
+    missing_skills: List[str]
+    reasoning: str
+
+    # youtube
+    youtube_links: List[str]
+    youtube_degraded: bool  # fallback or error output; not worth caching
+
+    # email
+    email_sent: bool
+
+    # seconds spent in each node
+    timings: Annotated[dict, merge_timings]
@@ -0,0 +1,129 @@
+# Structured JD profile: parse a job description once, reuse it for every candidate
+import os
+import re
+import json
+import hashlib
+import tempfile
+from typing import TypedDict, List, Optional
+
+from resume_score_agent import model, normalize_skill, EMBEDDING_MODEL
+from email_agent import extract_skills, SKILLS_KEYWORDS
+
+# Profiles are persisted by content hash, so one JD is only embedded once
+JD_CACHE_DIR = os.getenv("JD_CACHE_DIR", ".jd_cache")
+JD_SUMMARY_CHARS = 2000
+
+# Bump when build_jd_profile changes what it stores or how it extracts it
+JD_PROFILE_SCHEMA = 2
+
+# Persisted profiles built by another schema, embedding model or skill list are
+# rebuilt instead of being served with stale skills or incompatible embeddings
+PROFILE_VERSION = hashlib.sha256(
+    json.dumps([JD_PROFILE_SCHEMA, EMBEDDING_MODEL, SKILLS_KEYWORDS]).encode("utf-8")
+).hexdigest()[:16]
+
+class JDProfile(TypedDict):
+    version: str
+    jd_id: str
+    normalized_text: str
+    word_count: int
+    skills: List[str]
+    title: Optional[str]
+    company: Optional[str]
+    summary: str
+    embedding: List[float]
+    skill_embeddings: List[List[float]]
+
+_profiles: dict = {}
+
+def jd_hash(jd_text: str) -> str:
+    return hashlib.sha256(jd_text.strip().encode("utf-8")).hexdigest()
+
+def normalize_jd(jd_text: str) -> str:
+    # Same normalization the scorer has always applied to the JD
+    return jd_text.lower().replace("-", " ").replace("_", " ").strip()
+
+def extract_labeled_field(text: str, labels: str) -> Optional[str]:
+    """Value of a "Label: value" line (or "Label - value"), for one of the `labels` alternatives."""
+    match = re.search(rf"(?im)^[ \t]*(?:{labels})(?:[ \t]*:|[ \t]+[-–])[ \t]*(\S.*?)[ \t]*$", text)
+    if match and len(match.group(1)) <= 100:
+        return match.group(1).rstrip(",;")
+    return None
+
+# Only explicit labels: guesses from the first line or "at X" phrases put wrong
+# names into the cover letter, and the prompt handles a missing value fine
+def extract_job_title(text: str) -> Optional[str]:
+    return extract_labeled_field(text, r"job[ \t]*title|title|position|role|job[ \t]*role|designation")
+
+def extract_company_name(text: str) -> Optional[str]:
+    return extract_labeled_field(text, r"company(?:[ \t]*name)?|organi[sz]ation|employer")
+
+def compact_jd(text: str, max_chars: int = JD_SUMMARY_CHARS) -> str:
+    """Collapses whitespace, drops duplicate lines and trims the JD at a line boundary."""
+    seen = set()
+    lines = []
+    size = 0
+    for line in text.splitlines():
+        line = re.sub(r"\s+", " ", line).strip()
+        if not line or line.lower() in seen:
+            continue
+        if size + len(line) > max_chars:
+            break
+        seen.add(line.lower())
+        lines.append(line)
+        size += len(line) + 1
+    return "\n".join(lines)
+
+def build_jd_profile(jd_text: str) -> JDProfile:
+    normalized = normalize_jd(jd_text)
+    skills = extract_skills(jd_text)
+
+    embedding = model.encode(normalized)
+    skill_embeddings = model.encode([normalize_skill(skill) for skill in skills]) if skills else []
+
+    return {
+        "version": PROFILE_VERSION,
+        "jd_id": jd_hash(jd_text),
+        "normalized_text": normalized,
+        "word_count": len(jd_text.split()),
+        "skills": skills,
+        "title": extract_job_title(jd_text),
+        "company": extract_company_name(jd_text),
+        "summary": compact_jd(jd_text),
+        "embedding": [float(x) for x in embedding],
+        "skill_embeddings": [list(map(float, emb)) for emb in skill_embeddings],
+    }
+
+def _cache_path(jd_id: str) -> str:
+    return os.path.join(JD_CACHE_DIR, f"{jd_id}.json")
+
+def _load_profile(jd_id: str) -> Optional[JDProfile]:
+    try:
+        with open(_cache_path(jd_id), "r", encoding="utf-8") as f:
+            profile = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(profile, dict) or profile.get("version") != PROFILE_VERSION:
+        return None
+    return profile
+
+def _save_profile(profile: JDProfile) -> None:
+    try:
+        os.makedirs(JD_CACHE_DIR, exist_ok=True)
+        # Write then rename so concurrent readers never see a partial file
+        fd, tmp_path = tempfile.mkstemp(dir=JD_CACHE_DIR, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(profile, f)
+        os.replace(tmp_path, _cache_path(profile["jd_id"]))
+    except OSError as e:
+        print(f"[WARN] Could not persist JD profile: {e}")
+
+def get_jd_profile(jd_text: str) -> JDProfile:
+    """Returns the cached profile for this JD, building and persisting it on first use."""
+    jd_id = jd_hash(jd_text)
+    profile = _profiles.get(jd_id) or _load_profile(jd_id)
+    if profile is None:
+        profile = build_jd_profile(jd_text)
+        _save_profile(profile)
+    _profiles[jd_id] = profile
+    return profile
@@ -0,0 +1,238 @@
+# Admission control for LLM calls: per-model concurrency limits, per-tenant fair
+# queuing, priority classes and deadline-aware shedding
+import os
+import time
+import asyncio
+import threading
+import contextvars
+import concurrent.futures
+from collections import OrderedDict, deque
+from contextlib import contextmanager, asynccontextmanager
+from types import SimpleNamespace
+
+# Priority classes: lower value is served first
+INTERACTIVE = 0
+BULK = 1
+PRIORITIES = {"interactive": INTERACTIVE, "bulk": BULK}
+
+DEFAULT_LIMITS = {
+    "llama-3.3-70b-versatile": 4,
+    "llama-3.1-8b-instant": 8,
+}
+
+
+class RequestShed(Exception):
+    """Raised when a request cannot be admitted before its deadline."""
+
+
+def parse_limits(spec):
+    """Parses "model=4,other-model=8" (the LLM_CONCURRENCY env var)."""
+    limits = {}
+    for item in filter(None, (part.strip() for part in (spec or "").split(","))):
+        model, _, limit = item.partition("=")
+        limits[model.strip()] = int(limit)
+    return limits
+
+
+# Who is asking, and how urgently — set once per pipeline, read by every LLM call
+_request_context = contextvars.ContextVar(
+    "llm_request_context", default=SimpleNamespace(tenant="default", priority=INTERACTIVE, deadline=None)
+)
+
+
+@contextmanager
+def request_context(tenant="default", priority=INTERACTIVE, deadline=None):
+    """`deadline` is an absolute time.monotonic() value, or None for no deadline."""
+    token = _request_context.set(SimpleNamespace(tenant=tenant, priority=priority, deadline=deadline))
+    try:
+        yield
+    finally:
+        _request_context.reset(token)
+
+
+def current_request():
+    return _request_context.get()
+
+
+class _Job:
+    __slots__ = ("model", "tenant", "priority", "deadline", "future", "enqueued_at")
+
+    def __init__(self, model, tenant, priority, deadline):
+        self.model = model
+        self.tenant = tenant
+        self.priority = priority
+        self.deadline = deadline
+        self.future = concurrent.futures.Future()
+        self.enqueued_at = time.monotonic()
+
+
+class _ModelQueue:
+    def __init__(self, limit):
+        self.limit = limit
+        self.running = 0
+        # priority -> tenant -> deque of jobs; tenants are served round-robin
+        self.queues = {INTERACTIVE: OrderedDict(), BULK: OrderedDict()}
+        self.avg_service = None
+        self.waits = deque(maxlen=1000)
+        self.admitted = 0
+        self.shed = 0
+
+    def depth(self, priority=None):
+        priorities = [priority] if priority is not None else self.queues
+        return sum(len(jobs) for p in priorities for jobs in self.queues[p].values())
+
+
+class LLMScheduler:
+    """Grants slots for LLM calls; the call itself runs in the caller's thread or loop.
+
+    Slots are granted through concurrent.futures, so sync callers (streaming in
+    Streamlit) and async callers on any event loop share the same limits.
+    """
+
+    def __init__(self, limits=None, default_limit=4):
+        self.limits = dict(DEFAULT_LIMITS if limits is None else limits)
+        self.default_limit = default_limit
+        self._models = {}
+        self._lock = threading.Lock()
+
+    def _model(self, model):
+        if model not in self._models:
+            self._models[model] = _ModelQueue(self.limits.get(model, self.default_limit))
+        return self._models[model]
+
+    def _estimated_wait(self, mq, priority):
+        if mq.avg_service is None:
+            return 0.0
+        ahead = sum(mq.depth(p) for p in mq.queues if p <= priority)
+        busy = max(0, mq.running + ahead - mq.limit + 1)
+        return busy * mq.avg_service / mq.limit
+
+    def _enqueue(self, model, tenant, priority, deadline):
+        job = _Job(model, tenant, priority, deadline)
+        with self._lock:
+            mq = self._model(model)
+            if deadline is not None and job.enqueued_at + self._estimated_wait(mq, priority) > deadline:
+                mq.shed += 1
+                raise RequestShed(f"{model}: expected wait exceeds deadline")
+            mq.queues[priority].setdefault(tenant, deque()).append(job)
+            self._dispatch(mq)
+        return job
+
+    def _dispatch(self, mq):
+        # Called with the lock held
+        now = time.monotonic()
+        while mq.running < mq.limit:
+            job = self._next_job(mq)
+            if job is None:
+                return
+            if job.deadline is not None and now > job.deadline:
+                mq.shed += 1
+                if job.future.set_running_or_notify_cancel():
+                    job.future.set_exception(RequestShed(f"{job.model}: deadline passed while queued"))
+                continue
+            if not job.future.set_running_or_notify_cancel():
+                continue  # caller gave up
+            mq.running += 1
+            mq.admitted += 1
+            mq.waits.append(now - job.enqueued_at)
+            job.future.set_result(now)
+
+    def _next_job(self, mq):
+        for priority in sorted(mq.queues):
+            tenants = mq.queues[priority]
+            if tenants:
+                tenant, jobs = next(iter(tenants.items()))
+                job = jobs.popleft()
+                if jobs:
+                    tenants.move_to_end(tenant)
+                else:
+                    del tenants[tenant]
+                return job
+        return None
+
+    def _release(self, job, started):
+        with self._lock:
+            mq = self._models[job.model]
+            mq.running -= 1
+            service = time.monotonic() - started
+            mq.avg_service = service if mq.avg_service is None else 0.8 * mq.avg_service + 0.2 * service
+            self._dispatch(mq)
+
+    def _abandon(self, job):
+        """Caller stopped waiting: drop the job, or hand back a slot granted meanwhile."""
+        if job.future.cancel():
+            with self._lock:
+                mq = self._models[job.model]
+                jobs = mq.queues[job.priority].get(job.tenant)
+                if jobs and job in jobs:
+                    jobs.remove(job)
+                    if not jobs:
+                        del mq.queues[job.priority][job.tenant]
+                mq.shed += 1
+        elif not job.future.exception():
+            self._release(job, job.future.result())
+
+    def _job_args(self, tenant, priority, deadline):
+        ctx = current_request()
+        return (
+            ctx.tenant if tenant is None else tenant,
+            ctx.priority if priority is None else priority,
+            ctx.deadline if deadline is None else deadline,
+        )
+
+    @asynccontextmanager
+    async def slot(self, model, tenant=None, priority=None, deadline=None):
+        job = self._enqueue(model, *self._job_args(tenant, priority, deadline))
+        timeout = None if job.deadline is None else max(0.0, job.deadline - time.monotonic())
+        try:
+            # shield: a timeout must not cancel the concurrent future behind our back
+            started = await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(job.future)), timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            self._abandon(job)
+            if isinstance(e, asyncio.TimeoutError):
+                raise RequestShed(f"{model}: deadline passed while queued") from None
+            raise
+        try:
+            yield
+        finally:
+            self._release(job, started)
+
+    @contextmanager
+    def slot_sync(self, model, tenant=None, priority=None, deadline=None):
+        job = self._enqueue(model, *self._job_args(tenant, priority, deadline))
+        timeout = None if job.deadline is None else max(0.0, job.deadline - time.monotonic())
+        try:
+            started = job.future.result(timeout)
+        except concurrent.futures.TimeoutError:
+            self._abandon(job)
+            raise RequestShed(f"{model}: deadline passed while queued") from None
+        try:
+            yield
+        finally:
+            self._release(job, started)
+
+    def metrics(self):
+        """Queue depth, running slots and wait-time stats per model."""
+        out = {}
+        with self._lock:
+            for model, mq in self._models.items():
+                waits = sorted(mq.waits)
+                out[model] = {
+                    "limit": mq.limit,
+                    "running": mq.running,
+                    "queued_interactive": mq.depth(INTERACTIVE),
+                    "queued_bulk": mq.depth(BULK),
+                    "admitted": mq.admitted,
+                    "shed": mq.shed,
+                    "wait_p50_s": waits[len(waits) // 2] if waits else 0.0,
+                    "wait_p95_s": waits[int(len(waits) * 0.95)] if waits else 0.0,
+                    "wait_max_s": waits[-1] if waits else 0.0,
+                }
+        return out
+
+
+scheduler = LLMScheduler(
+    {**DEFAULT_LIMITS, **parse_limits(os.getenv("LLM_CONCURRENCY"))},
+    default_limit=int(os.getenv("LLM_DEFAULT_CONCURRENCY", "4")),
+)
+
@@ -0,0 +1,136 @@
+# Load generator: N concurrent pipelines against the local mock Groq + SMTP sink
+#
+#   python load_test.py --pipelines 500 --concurrency 100 --latency-ms 400 --latency-sigma 0.6
+#
+# Runs fully offline (OFFLINE_MODE=1) unless --external is given, in which case
+# the endpoints configured in the environment are used as-is. The embedding
+# model still runs locally and must already be in the sentence-transformers cache.
+import os
+import sys
+import time
+import asyncio
+import argparse
+import tempfile
+
+SAMPLE_RESUME = """Name: Jane Doe
+SUMMARY
+Data analyst with four years of experience turning raw data into decisions for product teams.
+TECHNICAL SKILLS
+Languages/Tools: Python, SQL, Excel, Tableau
+EXPERIENCE
+Data Analyst, Example Corp
+• Built automated reporting pipelines in Python and SQL that cut weekly reporting time by half.
+• Designed dashboards tracking retention and revenue for leadership reviews.
+PROJECTS
+Churn model: trained a gradient boosting classifier to predict customer churn from usage logs.
+EDUCATION
+B.Sc. Statistics, 2019
+"""
+
+SAMPLE_JD = """Job Title: Machine Learning Engineer
+Company: Example Labs
+Example Labs is hiring a Machine Learning Engineer to build production models.
+You will design, train and deploy Deep Learning and NLP models, write clean Python,
+query data with SQL, and work with product teams on Computer Vision features.
+Experience with Java services and JavaScript dashboards is a plus.
+"""
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+async def run_load(args):
+    from jd_profile import get_jd_profile
+    from pipeline import run_pipeline
+    from youtube_utility import http_client
+
+    resume_text = open(args.resume, encoding="utf-8").read() if args.resume else SAMPLE_RESUME
+    jd_text = open(args.jd, encoding="utf-8").read() if args.jd else SAMPLE_JD
+    jd_profile = get_jd_profile(jd_text)
+
+    limit = asyncio.Semaphore(args.concurrency)
+    node_times = {}
+    totals = []
+    errors = 0
+
+    async def one(i):
+        nonlocal errors
+        async with limit:
+            start = time.perf_counter()
+            try:
+                output = await run_pipeline(
+                    # A distinct resume per run, so nothing is served from a cache
+                    f"{resume_text}\nReference: run-{i}",
+                    jd_profile,
+                    f"candidate{i % args.tenants}@example.com",
+                    priority=args.priority,
+                    deadline_s=args.deadline_s,
+                )
+            except Exception as e:
+                errors += 1
+                print(f"[ERROR] pipeline {i}: {e}")
+                return
+            totals.append(time.perf_counter() - start)
+            for node, seconds in output.get("timings", {}).items():
+                node_times.setdefault(node, []).append(seconds)
+
+    wall_start = time.perf_counter()
+    # All pipelines share one connection pool
+    async with http_client():
+        await asyncio.gather(*(one(i) for i in range(args.pipelines)))
+    wall = time.perf_counter() - wall_start
+
+    print(f"\npipelines: {args.pipelines}  concurrency: {args.concurrency}  errors: {errors}")
+    print(f"wall time: {wall:.2f}s  throughput: {len(totals) / wall:.2f} pipelines/s\n")
+    print(f"{'stage':<20} {'p50 (s)':>8} {'p95 (s)':>8} {'p99 (s)':>8} {'max (s)':>8}")
+    for name, values in [*sorted(node_times.items()), ("end_to_end", totals)]:
+        print(f"{name:<20} {percentile(values, 50):>8.3f} {percentile(values, 95):>8.3f} "
+              f"{percentile(values, 99):>8.3f} {max(values, default=0.0):>8.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run N concurrent pipelines and report throughput and tail latency")
+    parser.add_argument("--pipelines", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--tenants", type=int, default=10, help="distinct user emails to spread runs over")
+    parser.add_argument("--priority", choices=["interactive", "bulk"], default="bulk")
+    parser.add_argument("--deadline-s", type=float, default=None)
+    parser.add_argument("--resume", help="resume text file (default: built-in sample)")
+    parser.add_argument("--jd", help="job description text file (default: built-in sample)")
+    parser.add_argument("--external", action="store_true", help="use configured endpoints, start no mocks")
+    parser.add_argument("--latency-ms", type=float, default=300.0)
+    parser.add_argument("--latency-sigma", type=float, default=0.5)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    if not args.external:
+        # Must be set before the agents import providers and build their clients
+        os.environ["OFFLINE_MODE"] = "1"
+        from mock_services import MockGroqConfig, SMTPSink, start_mock_groq, start_smtp_sink
+        config = MockGroqConfig(args.latency_ms, args.latency_sigma, args.error_rate, args.rate_limit_rate, args.seed)
+        sink = SMTPSink()
+        start_mock_groq(config)
+        start_smtp_sink(sink)
+
+    # Generated PDFs are written to the working directory; keep them out of the repo
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    os.chdir(tempfile.mkdtemp(prefix="ai_job_agent_load_"))
+
+    asyncio.run(run_load(args))
+
+    if not args.external:
+        print(f"\nmock LLM requests: {config.requests}  emails received: {sink.count}")
+
+    from llm_scheduler import scheduler
+    for model, stats in scheduler.metrics().items():
+        print(f"{model}: {stats}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+# Memory benchmark: peak memory per concurrent pipeline, legacy dict state vs lean delta state
+#
+#   python memory_bench.py --pipelines 200 --doc-kb 64
+#
+# Each mode runs in its own subprocess. Both modes get the same inputs, built
+# before measuring: one shared JD and a distinct resume, cover letter and Q&A
+# per pipeline. Node bodies are stubs doing the same work in both modes (no
+# model or network calls), so the numbers isolate what the graph state costs.
+# The lean mode drives the real pipeline.run_pipeline and pipeline.build_graph,
+# so importing it still loads the embedding model. Peak memory is taken from
+# tracemalloc, started after the imports and the inputs, which keeps the model
+# weights and the inputs out of the figure.
+import os
+import sys
+import json
+import random
+import string
+import asyncio
+import argparse
+import tempfile
+import subprocess
+import tracemalloc
+
+from langgraph.graph import StateGraph, END
+
+import document_store
+
+JOB_SKILLS = ["Python", "SQL", "NLP", "Machine Learning"]
+
+
+def make_text(kb, seed):
+    rng = random.Random(seed)
+    words = ["".join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 9))) for _ in range(500)]
+    text = []
+    size = 0
+    while size < kb * 1024:
+        word = rng.choice(words)
+        text.append(word)
+        size += len(word) + 1
+    return " ".join(text)
+
+
+def make_inputs(pipelines, doc_kb):
+    """One JD shared by every candidate, and per pipeline its own resume, cover letter and Q&A."""
+    jd_text = make_text(doc_kb, seed=0)
+    jd_profile = {"jd_id": document_store.content_id(jd_text), "normalized_text": jd_text, "skills": JOB_SKILLS}
+    submissions = [
+        {
+            "resume_text": make_text(doc_kb, seed=3 * i + 1),
+            "user_email": f"bench{i}@example.com",
+            "cover_letter": make_text(max(1, doc_kb // 4), seed=3 * i + 2),
+            "qa_guide": make_text(max(1, doc_kb // 4), seed=3 * i + 3),
+        }
+        for i in range(pipelines)
+    ]
+    return jd_text, jd_profile, submissions
+
+
+# ------------------------ Legacy: {**state, ...} at every node ------------------------
+
+def build_legacy_graph(latency):
+    async def score(state):
+        await asyncio.sleep(latency)
+        return {**state, "score": 42.0, "missing_skills": state["job_skills"][:2], "reasoning": "stub"}
+
+    async def youtube(state):
+        await asyncio.sleep(latency)
+        return {**state, "youtube_links": [f"- [{s}](https://youtube.com)" for s in state["missing_skills"]]}
+
+    async def email(state):
+        await asyncio.sleep(latency)
+        attachments = len(state["cover_letter"]) + len(state["qa_guide"])
+        return {**state, "email_sent": attachments > 0}
+
+    builder = StateGraph(dict)
+    builder.add_node("resume_skill_match", score)
+    builder.add_node("youtube", youtube)
+    builder.add_node("email", email)
+    builder.set_entry_point("resume_skill_match")
+    builder.add_edge("resume_skill_match", "youtube")
+    builder.add_edge("youtube", "email")
+    builder.add_edge("email", END)
+    return builder.compile()
+
+
+async def run_legacy(graph, jd_text, submission):
+    state = {**submission, "jd_text": jd_text, "job_skills": JOB_SKILLS}
+    return await graph.ainvoke(state)
+
+
+# ------------------------ Lean: the real pipeline with stub node bodies ------------------------
+
+def build_lean_graph(pipeline, latency):
+    async def score(state):
+        await asyncio.sleep(latency)
+        skills = document_store.get(state["jd_id"])["skills"]
+        return {"score": 42.0, "missing_skills": skills[:2], "reasoning": "stub"}
+
+    async def youtube(state):
+        await asyncio.sleep(latency)
+        return {"youtube_links": [f"- [{s}](https://youtube.com)" for s in state["missing_skills"]]}
+
+    async def email(state):
+        await asyncio.sleep(latency)
+        attachments = len(document_store.get(state["cover_letter_id"])) + len(document_store.get(state["qa_guide_id"]))
+        return {"email_sent": attachments > 0}
+
+    return pipeline.build_graph(resume_skill_match=score, youtube=youtube, email=email)
+
+
+# ------------------------ Driver ------------------------
+
+async def run_mode(mode, pipelines, doc_kb, latency):
+    jd_text, jd_profile, submissions = make_inputs(pipelines, doc_kb)
+
+    if mode == "legacy":
+        graph = build_legacy_graph(latency)
+        runs = [run_legacy(graph, jd_text, s) for s in submissions]
+    else:
+        # A fresh run store, so no submission is answered from an earlier bench
+        os.environ["RUN_STORE_PATH"] = os.path.join(tempfile.mkdtemp(prefix="memory_bench_"), "run_store.sqlite3")
+        import pipeline
+        pipeline.graph = build_lean_graph(pipeline, latency)
+        runs = [
+            pipeline.run_pipeline(s["resume_text"], jd_profile, s["user_email"], s["cover_letter"], s["qa_guide"])
+            for s in submissions
+        ]
+
+    tracemalloc.start()
+    await asyncio.gather(*runs)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"mode": mode, "pipelines": pipelines, "peak_kb": peak / 1024, "kb_per_pipeline": peak / 1024 / pipelines}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Peak memory per concurrent pipeline: legacy vs lean graph state")
+    parser.add_argument("--pipelines", type=int, default=200)
+    parser.add_argument("--doc-kb", type=int, default=64, help="size of each resume / JD in KB (cover letter and Q&A: a quarter)")
+    parser.add_argument("--latency", type=float, default=0.05, help="stub node latency in seconds")
+    parser.add_argument("--mode", choices=["legacy", "lean"], help="run one mode in-process (internal)")
+    args = parser.parse_args()
+
+    if args.mode:
+        print(json.dumps(asyncio.run(run_mode(args.mode, args.pipelines, args.doc_kb, args.latency))))
+        return
+
+    results = []
+    for mode in ("legacy", "lean"):
+        out = subprocess.run(
+            [sys.executable, __file__, "--mode", mode, "--pipelines", str(args.pipelines),
+             "--doc-kb", str(args.doc_kb), "--latency", str(args.latency)],
+            capture_output=True, text=True, check=True,
+        )
+        results.append(json.loads(out.stdout.strip().splitlines()[-1]))
+
+    print(f"{'mode':<8} {'pipelines':>9} {'peak (MB)':>10} {'KB/pipeline':>12}")
+    for r in results:
+        print(f"{r['mode']:<8} {r['pipelines']:>9} {r['peak_kb'] / 1024:>10.1f} {r['kb_per_pipeline']:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,251 @@
+# Local stand-ins for Groq and Gmail, for offline runs and load tests
+#
+#   python mock_services.py --latency-ms 400 --latency-sigma 0.5 --error-rate 0.02
+#   OFFLINE_MODE=1 streamlit run app.py
+#
+# The Groq mock speaks the OpenAI-compatible chat completions API (including
+# streaming) with seeded, reproducible latency and errors. Replies are derived
+# from the prompt so the same request always gets the same text. The SMTP sink
+# accepts and counts mail without delivering it.
+import os
+import re
+import json
+import time
+import random
+import hashlib
+import argparse
+import threading
+import socketserver
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Same variables providers.py reads in OFFLINE_MODE
+MOCK_GROQ_PORT = int(os.getenv("MOCK_GROQ_PORT", "8089"))
+MOCK_SMTP_PORT = int(os.getenv("MOCK_SMTP_PORT", "8025"))
+
+
+# ------------------------ Mock Groq ------------------------
+
+class MockGroqConfig:
+    def __init__(self, latency_ms=300.0, latency_sigma=0.0, error_rate=0.0, rate_limit_rate=0.0, seed=42):
+        self.latency_ms = latency_ms        # median latency
+        self.latency_sigma = latency_sigma  # lognormal spread; 0 = constant
+        self.error_rate = error_rate        # share of requests answered with 500
+        self.rate_limit_rate = rate_limit_rate  # share answered with 429
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.requests = 0
+
+    def sample(self):
+        """Returns (latency_s, status) from the seeded distributions."""
+        with self._lock:
+            self.requests += 1
+            latency = self.latency_ms / 1000.0
+            if self.latency_sigma:
+                latency *= self._rng.lognormvariate(0.0, self.latency_sigma)
+            roll = self._rng.random()
+        if roll < self.rate_limit_rate:
+            return latency, 429
+        if roll < self.rate_limit_rate + self.error_rate:
+            return latency, 500
+        return latency, 200
+
+
+def mock_reply(prompt):
+    """Deterministic text in the shape each node's parser expects."""
+    digest = hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:8]
+    upskill = re.search(r"upskill: (.+?)\.\n", prompt)
+    if upskill:
+        lines = []
+        for skill in (s.strip() for s in upskill.group(1).split(",")):
+            slug = re.sub(r"\W+", "-", skill.lower()).strip("-")
+            lines.append(f"Skill: {skill}")
+            lines.append(f"- [{skill} Crash Course](https://youtube.com/watch?v={slug}-{digest}) - Channel: Mock Academy")
+        return "\n".join(lines)
+    if "cover letter" in prompt:
+        return (f"HEADER\nCandidate Name\n\nRECIPIENT\nHiring Manager\n\nBODY\n"
+                f"I am excited to apply for this role (ref {digest}).\n\n"
+                "My experience aligns closely with the requirements.\n\n"
+                "Thank you for your time and consideration.")
+    return "\n".join(f"Q{i}: Mock question {i} ({digest})?\nA{i}: Mock answer {i}." for i in range(1, 11))
+
+
+def make_groq_handler(config):
+    class MockGroqHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):
+            pass
+
+        def _send_json(self, status, payload):
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_POST(self):
+            if not self.path.endswith("/chat/completions"):
+                self._send_json(404, {"error": {"message": "not found"}})
+                return
+            request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            latency, status = config.sample()
+            if status != 200:
+                time.sleep(latency)
+                self._send_json(status, {"error": {"message": f"mock error {status}", "type": "mock"}})
+                return
+
+            prompt = "\n".join(m.get("content", "") for m in request.get("messages", []))
+            reply = mock_reply(prompt)
+            model = request.get("model", "mock")
+            completion_id = f"chatcmpl-{hashlib.sha256(prompt.encode('utf-8')).hexdigest()[:12]}"
+
+            if request.get("stream"):
+                self._stream(completion_id, model, reply, latency)
+                return
+
+            time.sleep(latency)
+            self._send_json(200, {
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": reply}, "finish_reason": "stop"}],
+                "usage": {"prompt_tokens": len(prompt.split()), "completion_tokens": len(reply.split()),
+                          "total_tokens": len(prompt.split()) + len(reply.split())},
+            })
+
+        def _stream(self, completion_id, model, reply, latency):
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Connection", "close")
+            self.end_headers()
+            self.close_connection = True
+            # Time to first token is half the latency, the rest is spread over the tokens
+            tokens = re.findall(r"\S+\s*", reply) or [""]
+            time.sleep(latency / 2)
+            for i, token in enumerate(tokens):
+                delta = {"content": token} if i else {"role": "assistant", "content": token}
+                self._event({"id": completion_id, "object": "chat.completion.chunk", "created": int(time.time()),
+                             "model": model, "choices": [{"index": 0, "delta": delta, "finish_reason": None}]})
+                time.sleep(latency / 2 / len(tokens))
+            self._event({"id": completion_id, "object": "chat.completion.chunk", "created": int(time.time()),
+                         "model": model, "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]})
+            self.wfile.write(b"data: [DONE]\n\n")
+            self.wfile.flush()
+
+        def _event(self, payload):
+            self.wfile.write(f"data: {json.dumps(payload)}\n\n".encode("utf-8"))
+            self.wfile.flush()
+
+    return MockGroqHandler
+
+
+def start_mock_groq(config, host="127.0.0.1", port=MOCK_GROQ_PORT):
+    server = ThreadingHTTPServer((host, port), make_groq_handler(config))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+# ------------------------ SMTP sink ------------------------
+
+class SMTPSink:
+    """Collects message counts (and optionally raw messages) instead of delivering."""
+
+    def __init__(self, keep_messages=False):
+        self.keep_messages = keep_messages
+        self.messages = []
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def deliver(self, mail_from, rcpt_to, data):
+        with self._lock:
+            self.count += 1
+            if self.keep_messages:
+                self.messages.append({"from": mail_from, "to": list(rcpt_to), "data": data})
+
+
+def make_smtp_handler(sink):
+    class SMTPSinkHandler(socketserver.StreamRequestHandler):
+        def reply(self, line):
+            self.wfile.write(f"{line}\r\n".encode("ascii"))
+
+        def handle(self):
+            self.reply("220 localhost mock SMTP sink ready")
+            mail_from, rcpt_to = None, []
+            while True:
+                line = self.rfile.readline()
+                if not line:
+                    return
+                command = line.decode("utf-8", "replace").strip()
+                verb = command.split(" ", 1)[0].upper()
+                if verb == "EHLO":
+                    self.wfile.write(b"250-localhost\r\n250-8BITMIME\r\n250 SIZE 52428800\r\n")
+                elif verb == "HELO":
+                    self.reply("250 localhost")
+                elif verb == "MAIL":
+                    mail_from, rcpt_to = command[10:].strip(), []
+                    self.reply("250 OK")
+                elif verb == "RCPT":
+                    rcpt_to.append(command[8:].strip())
+                    self.reply("250 OK")
+                elif verb == "DATA":
+                    self.reply("354 End data with <CR><LF>.<CR><LF>")
+                    chunks = []
+                    while True:
+                        data_line = self.rfile.readline()
+                        if not data_line or data_line in (b".\r\n", b".\n"):
+                            break
+                        chunks.append(data_line)
+                    sink.deliver(mail_from, rcpt_to, b"".join(chunks))
+                    self.reply("250 OK queued")
+                elif verb in ("RSET", "NOOP"):
+                    mail_from, rcpt_to = (None, []) if verb == "RSET" else (mail_from, rcpt_to)
+                    self.reply("250 OK")
+                elif verb == "QUIT":
+                    self.reply("221 Bye")
+                    return
+                else:
+                    self.reply("502 Command not implemented")
+
+    return SMTPSinkHandler
+
+
+class _ThreadingTCPServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+def start_smtp_sink(sink, host="127.0.0.1", port=MOCK_SMTP_PORT):
+    server = _ThreadingTCPServer((host, port), make_smtp_handler(sink))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mock Groq API and SMTP sink for offline runs")
+    parser.add_argument("--groq-port", type=int, default=MOCK_GROQ_PORT)
+    parser.add_argument("--smtp-port", type=int, default=MOCK_SMTP_PORT)
+    parser.add_argument("--latency-ms", type=float, default=300.0, help="median LLM latency")
+    parser.add_argument("--latency-sigma", type=float, default=0.0, help="lognormal spread of the latency")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of 500 responses")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="share of 429 responses")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    config = MockGroqConfig(args.latency_ms, args.latency_sigma, args.error_rate, args.rate_limit_rate, args.seed)
+    sink = SMTPSink()
+    start_mock_groq(config, port=args.groq_port)
+    start_smtp_sink(sink, port=args.smtp_port)
+    print(f"Mock Groq on http://127.0.0.1:{args.groq_port}, SMTP sink on 127.0.0.1:{args.smtp_port} (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(10)
+            print(f"[mock] LLM requests: {config.requests}, emails received: {sink.count}")
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+# LangGraph pipeline: Resume Skill Match → YouTube Suggestions → Email Agent
+import time
+import asyncio
+
+from langgraph.graph import StateGraph, END
+
+import document_store
+import run_store
+from llm_scheduler import request_context, PRIORITIES
+from graph_state import PipelineState
+from resume_score_agent import resume_skill_match_agent
+from email_agent import email_agent_node_async as email_agent
+from youtube_utility import youtube_utility_async as youtube_utility, http_client
+
+
+def timed_node(name, node):
+    """Wraps an async node so its delta also reports how long it took."""
+    async def run(state):
+        start = time.perf_counter()
+        if hasattr(node, "ainvoke"):
+            delta = await node.ainvoke(state)
+        else:
+            delta = await node(state)
+        return {**delta, "timings": {name: time.perf_counter() - start}}
+    return run
+
+
+email_node = timed_node("email", email_agent)
+
+
+def build_graph(resume_skill_match=resume_skill_match_agent, youtube=youtube_utility, email=None):
+    """Nodes can be swapped (e.g. stubs in memory_bench.py); edges and state stay the same."""
+    builder = StateGraph(PipelineState)
+
+    builder.add_node("resume_skill_match", timed_node("resume_skill_match", resume_skill_match))
+    builder.add_node("youtube", timed_node("youtube", youtube))
+    builder.add_node("email", email_node if email is None else timed_node("email", email))
+
+    builder.set_entry_point("resume_skill_match")
+
+    # Explicit edges showing how data flows
+    builder.add_edge("resume_skill_match", "youtube")
+    builder.add_edge("youtube", "email")
+    builder.add_edge("email", END)
+
+    return builder.compile()
+
+
+graph = build_graph()
+
+
+async def run_pipeline(resume_text, jd_profile, user_email, cover_letter=None, qa_guide=None, resume_headings=None,
+                       priority="interactive", deadline_s=None, claimed=False):
+    """Runs the graph once; texts are shared through document_store for the run's lifetime.
+
+    LLM calls are scheduled for tenant `user_email` in the given priority class
+    ("interactive" or "bulk"), and shed once `deadline_s` seconds have passed.
+    Repeat submissions of the same resume, JD and email reuse the stored result,
+    and identical submissions in flight share a single execution. Pass
+    `claimed=True` if the caller already claimed the run (run_store.claim_run),
+    e.g. before streaming the cover letter and Q&A.
+    """
+    key = run_store.run_key(resume_text, jd_profile["jd_id"], user_email)
+    return await run_store.coalesce(key, lambda: _run(
+        key, resume_text, jd_profile, user_email, cover_letter, qa_guide, resume_headings, priority, deadline_s,
+    ), claimed=claimed)
+
+
+def collect_texts(state, output, doc_ids):
+    """The cover letter and Q&A texts of a finished run; ids the email node added
+    are appended to `doc_ids` so they are released with the inputs."""
+    texts = {}
+    for name in ("cover_letter", "qa_guide"):
+        doc_id = output.get(f"{name}_id")
+        if doc_id != state.get(f"{name}_id"):
+            doc_ids.append(doc_id)
+        text = document_store.get(doc_id)
+        if text is not None:
+            texts[name] = text
+    return texts
+
+
+async def _run(key, resume_text, jd_profile, user_email, cover_letter, qa_guide, resume_headings, priority, deadline_s):
+    resume_id = document_store.put(resume_text)
+    jd_id = document_store.put(jd_profile, doc_id=jd_profile["jd_id"], kind="jd")
+    cover_letter_id = document_store.put(cover_letter) if cover_letter is not None else None
+    qa_guide_id = document_store.put(qa_guide) if qa_guide is not None else None
+
+    state: PipelineState = {
+        "run_key": key,
+        "resume_id": resume_id,
+        "jd_id": jd_id,
+        "user_email": user_email,
+        "resume_headings": resume_headings or [],
+        "cover_letter_id": cover_letter_id,
+        "qa_guide_id": qa_guide_id,
+        "timings": {},
+    }
+    doc_ids = [resume_id, jd_id, cover_letter_id, qa_guide_id]
+    deadline = None if deadline_s is None else time.monotonic() + deadline_s
+    try:
+        with request_context(tenant=user_email, priority=PRIORITIES[priority], deadline=deadline):
+            # SQLite calls block, so they run off the event loop
+            cached = await asyncio.to_thread(run_store.get_result, key)
+            if cached is not None:
+                # Everything comes from the store; the email node still runs with
+                # the stored texts and sends only if outside the dedup window
+                for name in ("cover_letter", "qa_guide"):
+                    if state[f"{name}_id"] is None and cached.get(name) is not None:
+                        state[f"{name}_id"] = document_store.put(cached[name])
+                        doc_ids.append(state[f"{name}_id"])
+                output = {**state, **await email_node(state)}
+                return {**output, **cached, **collect_texts(state, output, doc_ids), "cached": True}
+
+            # One HTTP client per run, closed before the event loop goes away
+            async with http_client():
+                output = await graph.ainvoke(state)
+            output = {**output, **collect_texts(state, output, doc_ids)}
+            await asyncio.to_thread(run_store.save_result, key, output)
+            return output
+    finally:
+        for doc_id in doc_ids:
+            document_store.release(doc_id)
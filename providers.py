@@ -0,0 +1,57 @@
+# Provider layer: where LLM and SMTP traffic goes, configured from the environment
+#
+#   GROQ_API_BASE   Groq (or Groq-compatible) root URL   default https://api.groq.com
+#   SMTP_HOST       SMTP server                          default smtp.gmail.com
+#   SMTP_PORT                                            default 587
+#   SMTP_STARTTLS   1/0                                  default 1
+#   SMTP_AUTH       1/0, log in with EMAIL_USER/PASS     default 1
+#   OFFLINE_MODE    1 = point everything at mock_services.py on localhost
+import os
+from dotenv import load_dotenv
+from langchain_groq import ChatGroq
+
+load_dotenv()
+
+OFFLINE_MODE = os.getenv("OFFLINE_MODE", "0") == "1"
+
+# Local endpoints used by mock_services.py
+MOCK_GROQ_PORT = int(os.getenv("MOCK_GROQ_PORT", "8089"))
+MOCK_SMTP_PORT = int(os.getenv("MOCK_SMTP_PORT", "8025"))
+
+
+def _env_flag(name, default):
+    return os.getenv(name, default) == "1"
+
+
+def groq_api_base():
+    default = f"http://127.0.0.1:{MOCK_GROQ_PORT}" if OFFLINE_MODE else "https://api.groq.com"
+    return os.getenv("GROQ_API_BASE", default).rstrip("/")
+
+
+def groq_api_key():
+    # The mock server ignores the key, but the clients insist on having one
+    return os.getenv("GROQ_API_KEY") or ("offline" if OFFLINE_MODE else None)
+
+
+def chat_completions_url():
+    return f"{groq_api_base()}/openai/v1/chat/completions"
+
+
+def groq_headers():
+    return {
+        "Authorization": f"Bearer {groq_api_key()}",
+        "Content-Type": "application/json"
+    }
+
+
+def get_chat_llm(model):
+    return ChatGroq(api_key=groq_api_key(), model=model, base_url=groq_api_base())
+
+
+def smtp_settings():
+    return {
+        "host": os.getenv("SMTP_HOST", "127.0.0.1" if OFFLINE_MODE else "smtp.gmail.com"),
+        "port": int(os.getenv("SMTP_PORT", str(MOCK_SMTP_PORT) if OFFLINE_MODE else "587")),
+        "starttls": _env_flag("SMTP_STARTTLS", "0" if OFFLINE_MODE else "1"),
+        "auth": _env_flag("SMTP_AUTH", "0" if OFFLINE_MODE else "1"),
+    }
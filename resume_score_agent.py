@@ -2,24 +2,27 @@ from sentence_transformers import SentenceTransformer, util
 from typing import TypedDict, List
 from langchain_core.runnables import RunnableConfig, RunnableLambda
 import torch
+import asyncio
+import document_store
+from resume_sections import segment_resume, prose_chunks, lexical_text, skill_in_text, PROSE_SECTIONS
 
 #import nltk
 #from nltk.tokenize import sent_tokenize
 #from nltk.tokenize import sent_tokenize
 
 import re
-def simple_sent_tokenize(text: str) -> list[str]:
-    return re.split(r'(?<=[.!?])\s+', text.strip())
 
 # Load model once
-model = SentenceTransformer('all-MiniLM-L6-v2')
+EMBEDDING_MODEL = 'all-MiniLM-L6-v2'
+model = SentenceTransformer(EMBEDDING_MODEL)
 
-class ResumeInput(TypedDict):
-    resume_text: str
-    jd_text: str
-    job_skills: List[str]
+class ResumeInput(TypedDict, total=False):
+    resume_id: str  # document_store ID of the resume text
+    jd_id: str      # document_store ID of the jd_profile.JDProfile
+    resume_headings: List[str]  # heading lines detected from the PDF layout
 
-class ResumeOutput(ResumeInput):
+# Only the keys this node adds; the inputs are not re-carried
+class ResumeOutput(TypedDict):
     score: float
     missing_skills: List[str]
     reasoning: str
@@ -28,52 +31,56 @@ def normalize_skill(skill: str) -> str:
     return re.sub(r"[^\w\s]", "", skill.lower().replace("-", " ").replace("_", " ").strip())
 
 def score_resume_vs_jd(inputs: ResumeInput, config: RunnableConfig = None) -> ResumeOutput:
-    resume = inputs["resume_text"]
-    jd = inputs["jd_text"]
-    job_skills = inputs["job_skills"]
+    resume = document_store.get(inputs["resume_id"])
+    jd_profile = document_store.get(inputs["jd_id"])
+    job_skills = jd_profile["skills"]
 
     # Basic input validation
-    if not resume.strip() or not jd.strip():
+    if not resume.strip() or not jd_profile["normalized_text"]:
         return {
-            **inputs,
             "score": 0.0,
             "missing_skills": job_skills,
             "reasoning": "Empty resume or JD provided."
         }
-    if len(resume.strip().split()) < 20 or len(jd.strip().split()) < 20:
+    if len(resume.strip().split()) < 20 or jd_profile["word_count"] < 20:
         return {
-            **inputs,
             "score": 0.0,
             "missing_skills": job_skills,
             "reasoning": "Resume or JD too short to analyze meaningfully."
         }
 
-    # Preprocess resume and JD
-    jd_cleaned = jd.lower().replace("-", " ").replace("_", " ").strip()
-   
-    resume_chunks = [
-        
-        re.sub(r"[^\w\s]", "", chunk.lower().strip())
-        for chunk in simple_sent_tokenize(resume) #used instead of sen_tokenize
-    ]
+    # Segment the resume (the JD is normalized once in its profile)
+    sections = segment_resume(resume, inputs.get("resume_headings"))
 
-    # Embeddings
+    # Embeddings (JD side is precomputed and cached per JD)
     emb_resume = model.encode(resume, convert_to_tensor=True)
-    emb_jd = model.encode(jd_cleaned, convert_to_tensor=True)
-    emb_chunks = model.encode(resume_chunks, convert_to_tensor=True)
+    emb_jd = torch.tensor(jd_profile["embedding"], device=emb_resume.device)
 
     # Compute similarity score
     score = float(util.cos_sim(emb_resume, emb_jd).item() * 100)
 
     # Missing skills detection
-    normalized_job_skills = [normalize_skill(skill) for skill in job_skills]
-    skill_embeddings = model.encode(normalized_job_skills, convert_to_tensor=True)
+    # 1. Cheap lexicon match: skill lists, education etc. first, then prose
+    skill_text = lexical_text(" ".join(body for name, body in sections.items() if name not in PROSE_SECTIONS))
+    prose_text = lexical_text(" ".join(body for name, body in sections.items() if name in PROSE_SECTIONS))
+    unmatched = [
+        i for i, skill in enumerate(job_skills)
+        if not skill_in_text(skill, skill_text) and not skill_in_text(skill, prose_text)
+    ]
 
+    # 2. Semantic match against prose chunks only (the whole text if the resume
+    #    has no headings), for what the lexicon missed
     missing_skills = []
-    for i, skill_emb in enumerate(skill_embeddings):
-        sim_scores = util.cos_sim(skill_emb, emb_chunks)
-        if torch.max(sim_scores).item() < 0.55:
-            missing_skills.append(job_skills[i])
+    resume_chunks = prose_chunks(sections) if unmatched else []
+    if resume_chunks:
+        emb_chunks = model.encode(resume_chunks, convert_to_tensor=True)
+        skill_embeddings = torch.tensor(jd_profile["skill_embeddings"], device=emb_resume.device)
+        for i in unmatched:
+            sim_scores = util.cos_sim(skill_embeddings[i], emb_chunks)
+            if torch.max(sim_scores).item() < 0.55:
+                missing_skills.append(job_skills[i])
+    else:
+        missing_skills = [job_skills[i] for i in unmatched]
 
     # Reasoning
     if score > 75:
@@ -84,11 +91,16 @@ def score_resume_vs_jd(inputs: ResumeInput, config: RunnableConfig = None) -> Re
         reasoning = "Low alignment. Resume may not be a good fit for the JD."
 
     return {
-        **inputs,
         "score": round(score, 2),
         "missing_skills": missing_skills,
         "reasoning": reasoning
     }
 
-# Agent wrapper
-resume_skill_match_agent = RunnableLambda(score_resume_vs_jd)
+# Async variant: embedding is CPU-bound, so run it in the default executor
+# and keep the event loop free for other pipelines' I/O
+async def ascore_resume_vs_jd(inputs: ResumeInput, config: RunnableConfig = None) -> ResumeOutput:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, score_resume_vs_jd, inputs, config)
+
+# Agent wrapper (graph.ainvoke picks the async variant)
+resume_skill_match_agent = RunnableLambda(score_resume_vs_jd, afunc=ascore_resume_vs_jd)
@@ -0,0 +1,152 @@
+# Layout-aware resume segmentation: split a resume into labelled sections so that
+# skill lists are matched by lexicon and only prose sections get embedded
+import re
+from statistics import median
+from typing import Dict, List, Optional, Iterable
+
+# Heading aliases per section (compared after normalize_heading)
+SECTION_ALIASES = {
+    "summary": ["summary", "professional summary", "profile", "objective", "career objective", "about me"],
+    "skills": ["skills", "technical skills", "key skills", "core competencies", "technologies",
+               "tech stack", "tools", "languages and tools", "languages tools", "skills and tools"],
+    "experience": ["experience", "work experience", "professional experience", "employment",
+                   "employment history", "work history", "internships", "internship", "internship experience"],
+    "projects": ["projects", "personal projects", "academic projects", "key projects", "project work"],
+    "education": ["education", "academic background", "academics", "qualifications", "education and training"],
+    "certifications": ["certifications", "certificates", "achievements", "awards", "courses", "coursework"],
+}
+
+# Sections whose content is free-form prose worth embedding
+PROSE_SECTIONS = {"summary", "experience", "projects", "other"}
+
+_ALIAS_TO_SECTION = {alias: section for section, aliases in SECTION_ALIASES.items() for alias in aliases}
+
+
+def normalize_heading(line: str) -> str:
+    line = line.lower().replace("&", " and ").replace("/", " ")
+    line = re.sub(r"[^\w\s]", " ", line)
+    return re.sub(r"\s+", " ", line).strip()
+
+
+def classify_heading(line: str) -> Optional[str]:
+    return _ALIAS_TO_SECTION.get(normalize_heading(line))
+
+
+def _is_caps(line: str) -> bool:
+    letters = [c for c in line if c.isalpha()]
+    return bool(letters) and all(c.isupper() for c in letters)
+
+
+def looks_like_heading(line: str) -> bool:
+    """Text-only heading cue: a short line in capitals or ending with a colon."""
+    stripped = line.strip()
+    words = stripped.rstrip(":").split()
+    if not words or len(words) > 5:
+        return False
+    return stripped.endswith(":") or _is_caps(stripped)
+
+
+def extract_pdf_headings(pdf_path: str, page_numbers: Optional[List[int]] = None) -> List[str]:
+    """Layout cue: lines set noticeably larger than body text, or entirely in bold."""
+    from pdfminer.high_level import extract_pages
+    from pdfminer.layout import LTTextContainer, LTTextLine, LTChar
+
+    lines = []
+    for page in extract_pages(pdf_path, page_numbers=page_numbers):
+        for element in page:
+            if not isinstance(element, LTTextContainer):
+                continue
+            for text_line in element:
+                if not isinstance(text_line, LTTextLine):
+                    continue
+                chars = [c for c in text_line if isinstance(c, LTChar) and c.get_text().strip()]
+                if chars:
+                    lines.append((text_line.get_text().strip(), chars))
+
+    if not lines:
+        return []
+    body_size = median(c.size for _, chars in lines for c in chars)
+
+    headings = []
+    for text, chars in lines:
+        avg_size = sum(c.size for c in chars) / len(chars)
+        bold = all("bold" in c.fontname.lower() for c in chars)
+        if avg_size >= body_size * 1.15 or bold:
+            headings.append(text)
+    return headings
+
+
+def segment_resume(text: str, headings: Optional[Iterable[str]] = None) -> Dict[str, str]:
+    """Splits `text` into sections keyed by SECTION_ALIASES names.
+
+    `headings` are lines known to be headings from the PDF layout; without them
+    text-only cues are used. Lines before the first heading go to "header".
+    Unrecognised all-caps headings start an "other" section (keeping their text),
+    except inside skill lists and similar sections, where a caps line such as
+    "SQL" is content unless the layout marks it as a heading. A "Label: value"
+    line inside a prose section ("Tech stack: Python") files only its value
+    under the label's section; other unrecognised headings (bold job titles,
+    sub-labels) stay in the current section.
+    """
+    layout_headings = {normalize_heading(h) for h in headings} if headings else set()
+
+    sections: Dict[str, List[str]] = {}
+    current = "header"
+    for line in text.splitlines():
+        stripped = line.strip()
+        if not stripped:
+            continue
+
+        # Headings often carry content on the same line: "Skills: Python, SQL"
+        head, sep, rest = stripped.partition(":")
+        section = classify_heading(head if sep else stripped)
+        layout_heading = normalize_heading(stripped) in layout_headings
+        is_heading = layout_heading or looks_like_heading(stripped)
+
+        if section and sep and rest.strip() and current in PROSE_SECTIONS \
+                and not (layout_heading or _is_caps(head)):
+            # An inline label within a job or project entry, not a new section
+            sections.setdefault(section, []).append(rest.strip())
+            continue
+        if section and (is_heading or sep or not layout_headings):
+            current = section
+            if sep and rest.strip():
+                sections.setdefault(current, []).append(rest.strip())
+            continue
+        if is_heading and _is_caps(stripped) and current != "header" \
+                and (current in PROSE_SECTIONS or layout_heading):
+            current = "other"
+
+        sections.setdefault(current, []).append(stripped)
+
+    return {name: "\n".join(lines) for name, lines in sections.items()}
+
+
+def lexical_text(text: str) -> str:
+    return re.sub(r"\s+", " ", text.lower().replace("-", " ").replace("_", " "))
+
+
+def skill_in_text(skill: str, text: str) -> bool:
+    """Whole-term match that keeps symbols, so "C++" does not match a bare "C"."""
+    pattern = r"(?<![\w+#]){}(?![\w+#])".format(re.escape(lexical_text(skill).strip()))
+    return re.search(pattern, text) is not None
+
+
+def prose_chunks(sections: Dict[str, str], min_words: int = 3) -> List[str]:
+    """Bullet/line chunks from prose sections only, normalized and de-duplicated.
+
+    A resume without recognizable headings lands entirely in "header"; then
+    every section is chunked, so the semantic pass still has text to match.
+    """
+    chunks = []
+    seen = set()
+    has_prose = any(name in PROSE_SECTIONS and body.strip() for name, body in sections.items())
+    for name, body in sections.items():
+        if has_prose and name not in PROSE_SECTIONS:
+            continue
+        for chunk in re.split(r"[•\n]|(?<=[.!?])\s+", body):
+            chunk = re.sub(r"\s+", " ", re.sub(r"[^\w\s]", " ", chunk.lower())).strip()
+            if len(chunk.split()) >= min_words and chunk not in seen:
+                seen.add(chunk)
+                chunks.append(chunk)
+    return chunks
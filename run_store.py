@@ -0,0 +1,129 @@
+# Run store: idempotent pipeline runs keyed by a content hash of (resume, JD, email)
+#
+# - finished results (score, missing skills, suggestions, cover letter, Q&A) are
+#   persisted in SQLite and returned for repeat submissions instead of re-running
+# - the email is sent at most once per run key within EMAIL_DEDUP_WINDOW_S
+# - identical submissions in flight at the same time share one execution, from the
+#   first streamed token (app.py claims the run before streaming) to the result
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import asyncio
+import threading
+import concurrent.futures
+from contextlib import closing
+
+RUN_STORE_PATH = os.getenv("RUN_STORE_PATH", ".run_store.sqlite3")
+RUN_CACHE_TTL_S = float(os.getenv("RUN_CACHE_TTL_S", str(7 * 24 * 3600)))
+EMAIL_DEDUP_WINDOW_S = float(os.getenv("EMAIL_DEDUP_WINDOW_S", "3600"))
+
+# Only these output keys are cached; everything else is per-run
+CACHED_KEYS = ("score", "missing_skills", "reasoning", "youtube_links", "cover_letter", "qa_guide")
+
+_in_flight = {}
+_in_flight_lock = threading.Lock()
+
+
+def run_key(resume_text, jd_id, user_email):
+    resume_hash = hashlib.sha256(resume_text.strip().encode("utf-8")).hexdigest()
+    raw = f"{resume_hash}|{jd_id}|{user_email.strip().lower()}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def _connect():
+    conn = sqlite3.connect(RUN_STORE_PATH, timeout=10, isolation_level=None)
+    conn.execute("CREATE TABLE IF NOT EXISTS runs (run_key TEXT PRIMARY KEY, result TEXT NOT NULL, created_at REAL NOT NULL)")
+    conn.execute("CREATE TABLE IF NOT EXISTS emails (run_key TEXT PRIMARY KEY, sent_at REAL NOT NULL)")
+    return conn
+
+
+# ------------------------ Results ------------------------
+
+def get_result(key, max_age=RUN_CACHE_TTL_S):
+    with closing(_connect()) as conn:
+        row = conn.execute("SELECT result, created_at FROM runs WHERE run_key = ?", (key,)).fetchone()
+    if row is None or time.time() - row[1] > max_age:
+        return None
+    return json.loads(row[0])
+
+
+def save_result(key, output):
+    # Don't pin a failed or fallback suggestion lookup for the lifetime of the cache
+    if output.get("youtube_degraded"):
+        return
+    result = {k: output[k] for k in CACHED_KEYS if k in output}
+    with closing(_connect()) as conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO runs (run_key, result, created_at) VALUES (?, ?, ?)",
+            (key, json.dumps(result), time.time()),
+        )
+
+
+# ------------------------ Email dedup ------------------------
+
+def claim_email(key, window=EMAIL_DEDUP_WINDOW_S):
+    """Returns True if the caller may send the email for `key` now (and records it)."""
+    now = time.time()
+    with closing(_connect()) as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        row = conn.execute("SELECT sent_at FROM emails WHERE run_key = ?", (key,)).fetchone()
+        if row is not None and now - row[0] < window:
+            conn.execute("ROLLBACK")
+            return False
+        conn.execute("INSERT OR REPLACE INTO emails (run_key, sent_at) VALUES (?, ?)", (key, now))
+        conn.execute("COMMIT")
+    return True
+
+
+def release_email_claim(key):
+    """Forget a claim whose send failed, so a retry is not suppressed."""
+    with closing(_connect()) as conn:
+        conn.execute("DELETE FROM emails WHERE run_key = ?", (key,))
+
+
+# ------------------------ In-flight coalescing ------------------------
+
+def claim_run(key):
+    """Marks `key` as in flight. Returns None if the caller now owns the run
+    (and must call finish_run), else the owner's Future to wait on.
+
+    A concurrent.futures.Future, so callers on different event loops and
+    threads (separate Streamlit sessions) are coalesced too.
+    """
+    with _in_flight_lock:
+        future = _in_flight.get(key)
+        if future is None:
+            _in_flight[key] = concurrent.futures.Future()
+        return future
+
+
+def finish_run(key, result=None, error=None):
+    """Hands the owner's result (or error) to everyone waiting on `key`."""
+    with _in_flight_lock:
+        future = _in_flight.pop(key, None)
+    if future is None or future.done():
+        return
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(result)
+
+
+async def coalesce(key, run, claimed=False):
+    """Awaits `run()` once per key; concurrent callers with the same key share its result.
+
+    `claimed=True` means the caller already owns the run through claim_run.
+    """
+    future = None if claimed else claim_run(key)
+    if future is not None:
+        return await asyncio.wrap_future(future)
+
+    try:
+        result = await run()
+    except BaseException as e:
+        finish_run(key, error=e)
+        raise
+    finish_run(key, result=result)
+    return result
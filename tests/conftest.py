@@ -0,0 +1,47 @@
+import os
+import sys
+import atexit
+import shutil
+import socket
+import tempfile
+
+import pytest
+
+# The modules live at the repo root, next to app.py
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+# providers, run_store and jd_profile read these at import time, so they are
+# set before any test module imports them: mocks on free ports, state in a temp dir
+_state_dir = tempfile.mkdtemp(prefix="ai_job_agent_tests_")
+atexit.register(shutil.rmtree, _state_dir, ignore_errors=True)
+os.environ["OFFLINE_MODE"] = "1"
+os.environ["MOCK_GROQ_PORT"] = str(_free_port())
+os.environ["MOCK_SMTP_PORT"] = str(_free_port())
+os.environ["RUN_STORE_PATH"] = os.path.join(_state_dir, "run_store.sqlite3")
+os.environ["JD_CACHE_DIR"] = os.path.join(_state_dir, "jd_cache")
+for name in ("GROQ_API_BASE", "SMTP_HOST", "SMTP_PORT", "SMTP_STARTTLS", "SMTP_AUTH"):
+    os.environ.pop(name, None)
+
+
+@pytest.fixture(scope="session")
+def mock_services():
+    """Mock Groq and SMTP sink on the ports providers.py points at; yields (config, sink)."""
+    from mock_services import MockGroqConfig, SMTPSink, start_mock_groq, start_smtp_sink
+
+    config = MockGroqConfig(latency_ms=20.0)
+    sink = SMTPSink()
+    servers = [
+        start_mock_groq(config, port=int(os.environ["MOCK_GROQ_PORT"])),
+        start_smtp_sink(sink, port=int(os.environ["MOCK_SMTP_PORT"])),
+    ]
+    yield config, sink
+    for server in servers:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,35 @@
+# Test doubles shared by the test modules
+import time
+import asyncio
+from types import SimpleNamespace
+
+
+class FakeLLM:
+    """Stand-in for ChatGroq with configurable latency, for exercising the scheduler.
+
+    `latency` is seconds per call, or a zero-argument callable returning it.
+    """
+
+    def __init__(self, latency=0.1, reply="fake response"):
+        self.latency = latency
+        self.reply = reply
+        self.calls = 0
+
+    def _delay(self):
+        self.calls += 1
+        return self.latency() if callable(self.latency) else self.latency
+
+    def invoke(self, messages):
+        time.sleep(self._delay())
+        return SimpleNamespace(content=self.reply)
+
+    async def ainvoke(self, messages):
+        await asyncio.sleep(self._delay())
+        return SimpleNamespace(content=self.reply)
+
+    def stream(self, messages):
+        delay = self._delay()
+        words = self.reply.split(" ")
+        for i, word in enumerate(words):
+            time.sleep(delay / len(words))
+            yield SimpleNamespace(content=word if i == 0 else " " + word)
@@ -0,0 +1,26 @@
+import document_store
+
+
+def test_identical_texts_share_one_copy_until_released():
+    first = document_store.put("same text")
+    second = document_store.put("same text")
+    assert first == second
+    document_store.release(first)
+    assert document_store.get(second) == "same text"
+    document_store.release(second)
+    assert second not in document_store._documents
+
+
+def test_profile_and_text_with_the_same_key_do_not_collide():
+    text = "Job Title: Data Engineer\nCompany: Acme"
+    profile = {"jd_id": document_store.content_id(text), "skills": ["SQL"]}
+
+    jd_id = document_store.put(profile, doc_id=profile["jd_id"], kind="jd")
+    resume_id = document_store.put(text)  # a resume identical to the JD
+    try:
+        assert resume_id != jd_id
+        assert document_store.get(resume_id).strip() == text
+        assert document_store.get(jd_id)["skills"] == ["SQL"]
+    finally:
+        document_store.release(resume_id)
+        document_store.release(jd_id)
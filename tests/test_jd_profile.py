@@ -0,0 +1,36 @@
+import pytest
+
+for module in ("sentence_transformers", "langchain_groq", "aiosmtplib", "reportlab", "streamlit"):
+    pytest.importorskip(module)
+
+import jd_profile
+from load_test import SAMPLE_JD
+
+
+def test_title_and_company_come_from_labels():
+    assert jd_profile.extract_job_title(SAMPLE_JD) == "Machine Learning Engineer"
+    assert jd_profile.extract_company_name(SAMPLE_JD) == "Example Labs"
+    assert jd_profile.extract_job_title("Position - Data Engineer\nEmployer: Acme Inc.") == "Data Engineer"
+    assert jd_profile.extract_company_name("Position - Data Engineer\nEmployer: Acme Inc.") == "Acme Inc."
+
+
+def test_unlabeled_title_and_company_are_not_guessed():
+    text = ("We are a fast growing team.\n"
+            "Join Acme to build reliable data platforms.\n"
+            "Role-based access control experience is a plus.\n")
+    assert jd_profile.extract_job_title(text) is None
+    assert jd_profile.extract_company_name(text) is None
+
+
+def test_persisted_profile_from_another_version_is_rebuilt(tmp_path, monkeypatch):
+    monkeypatch.setattr(jd_profile, "JD_CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(jd_profile, "_profiles", {})
+    profile = jd_profile.get_jd_profile(SAMPLE_JD)
+    assert profile["version"] == jd_profile.PROFILE_VERSION
+    assert jd_profile._load_profile(profile["jd_id"]) == profile
+
+    jd_profile._save_profile({**profile, "version": "stale", "skills": []})
+    assert jd_profile._load_profile(profile["jd_id"]) is None
+
+    monkeypatch.setattr(jd_profile, "_profiles", {})
+    assert jd_profile.get_jd_profile(SAMPLE_JD)["skills"] == profile["skills"]
@@ -0,0 +1,122 @@
+import time
+import asyncio
+
+import pytest
+
+from fakes import FakeLLM
+from llm_scheduler import LLMScheduler, RequestShed, INTERACTIVE, BULK, request_context
+
+MODEL = "fake-model"
+
+
+async def call(scheduler, llm, order, label, **job):
+    async with scheduler.slot(MODEL, **job):
+        await llm.ainvoke([])
+        order.append(label)
+
+
+async def run_all(*calls):
+    # Tasks are started in order, so every call is queued before the first one finishes
+    return await asyncio.gather(*(asyncio.ensure_future(c) for c in calls), return_exceptions=True)
+
+
+def test_interactive_is_served_before_bulk():
+    scheduler, llm, order = LLMScheduler({MODEL: 1}), FakeLLM(latency=0.05), []
+    asyncio.run(run_all(
+        call(scheduler, llm, order, "running", tenant="a", priority=BULK),
+        call(scheduler, llm, order, "bulk-1", tenant="a", priority=BULK),
+        call(scheduler, llm, order, "bulk-2", tenant="b", priority=BULK),
+        call(scheduler, llm, order, "interactive", tenant="c", priority=INTERACTIVE),
+    ))
+    assert order == ["running", "interactive", "bulk-1", "bulk-2"]
+
+
+def test_tenants_are_served_round_robin():
+    scheduler, llm, order = LLMScheduler({MODEL: 1}), FakeLLM(latency=0.02), []
+    asyncio.run(run_all(
+        call(scheduler, llm, order, "x1", tenant="x"),
+        call(scheduler, llm, order, "a1", tenant="a"),
+        call(scheduler, llm, order, "a2", tenant="a"),
+        call(scheduler, llm, order, "a3", tenant="a"),
+        call(scheduler, llm, order, "b1", tenant="b"),
+    ))
+    assert order == ["x1", "a1", "b1", "a2", "a3"]
+
+
+def test_request_context_supplies_tenant_and_priority():
+    scheduler, llm, order = LLMScheduler({MODEL: 1}), FakeLLM(latency=0.05), []
+
+    async def in_context(label, priority):
+        with request_context(tenant=label, priority=priority):
+            await call(scheduler, llm, order, label)
+
+    asyncio.run(run_all(
+        in_context("running", BULK),
+        in_context("bulk", BULK),
+        in_context("interactive", INTERACTIVE),
+    ))
+    assert order == ["running", "interactive", "bulk"]
+
+
+def test_request_past_its_deadline_while_queued_is_shed():
+    scheduler, llm, order = LLMScheduler({MODEL: 1}), FakeLLM(latency=0.2), []
+    results = asyncio.run(run_all(
+        call(scheduler, llm, order, "running"),
+        call(scheduler, llm, order, "late", deadline=time.monotonic() + 0.05),
+    ))
+    assert order == ["running"]
+    assert isinstance(results[1], RequestShed)
+    assert scheduler.metrics()[MODEL]["shed"] == 1
+
+
+def test_request_is_shed_up_front_when_expected_wait_exceeds_deadline():
+    scheduler, llm, order = LLMScheduler({MODEL: 1}), FakeLLM(latency=0.1), []
+    asyncio.run(call(scheduler, llm, order, "warm-up"))  # learns the service time
+
+    async def busy_then_late():
+        running = asyncio.ensure_future(call(scheduler, llm, order, "running"))
+        await asyncio.sleep(0)
+        start = time.monotonic()
+        with pytest.raises(RequestShed):
+            await call(scheduler, llm, order, "late", deadline=start + 0.01)
+        shed_after = time.monotonic() - start
+        await running
+        return shed_after
+
+    assert asyncio.run(busy_then_late()) < 0.01
+    assert order == ["warm-up", "running"]
+
+
+def test_slot_sync_shares_limits_with_async_callers():
+    scheduler, llm = LLMScheduler({MODEL: 1}), FakeLLM(latency=0.01, reply="a b c")
+    with scheduler.slot_sync(MODEL):
+        assert "".join(chunk.content for chunk in llm.stream([])) == "a b c"
+        assert scheduler.metrics()[MODEL]["running"] == 1
+    assert scheduler.metrics()[MODEL]["running"] == 0
+
+
+def test_metrics():
+    scheduler, llm, order = LLMScheduler({MODEL: 2}), FakeLLM(latency=0.05), []
+    asyncio.run(run_all(*(call(scheduler, llm, order, i, priority=BULK) for i in range(4))))
+
+    stats = scheduler.metrics()[MODEL]
+    assert stats["limit"] == 2
+    assert stats["running"] == 0
+    assert stats["queued_interactive"] == stats["queued_bulk"] == 0
+    assert stats["admitted"] == 4 and stats["shed"] == 0
+    # Two calls ran straight away, two waited for a free slot
+    assert stats["wait_p50_s"] <= stats["wait_p95_s"] <= stats["wait_max_s"]
+    assert stats["wait_max_s"] >= 0.04
+
+
+def test_email_agent_llm_can_be_swapped_for_a_fake():
+    for module in ("langchain_groq", "langchain_core", "aiosmtplib", "reportlab", "streamlit", "dotenv"):
+        pytest.importorskip(module)
+    import email_agent
+
+    previous = email_agent.set_llm(FakeLLM(latency=0.0, reply="Dear Hiring Manager"))
+    try:
+        assert asyncio.run(email_agent.ainvoke_llm("prompt")) == "Dear Hiring Manager"
+        assert "".join(email_agent.stream_llm("prompt")) == "Dear Hiring Manager"
+    finally:
+        email_agent.set_llm(previous)
@@ -0,0 +1,71 @@
+# End-to-end run of the graph against the local mock Groq and SMTP sink
+import asyncio
+
+import pytest
+
+for module in ("langgraph", "langchain_groq", "sentence_transformers", "httpx", "aiosmtplib", "reportlab", "streamlit"):
+    pytest.importorskip(module)
+
+from load_test import SAMPLE_RESUME, SAMPLE_JD
+
+
+@pytest.fixture
+def pipeline(mock_services, tmp_path, monkeypatch):
+    # Attachments are rendered into the working directory
+    monkeypatch.chdir(tmp_path)
+    import pipeline
+    return pipeline
+
+
+@pytest.fixture
+def jd_profile():
+    from jd_profile import get_jd_profile
+    return get_jd_profile(SAMPLE_JD)
+
+
+def test_pipeline_suggests_videos_and_sends_one_email(pipeline, jd_profile, mock_services):
+    _, sink = mock_services
+    emails_before = sink.count
+
+    output = asyncio.run(pipeline.run_pipeline(SAMPLE_RESUME, jd_profile, "first@example.com"))
+
+    assert output["missing_skills"]
+    assert any("Crash Course" in line for line in output["youtube_links"])
+    assert output["email_sent"] is True
+    assert sink.count == emails_before + 1
+
+
+def test_repeat_submission_is_served_from_the_store_without_a_second_email(pipeline, jd_profile, mock_services):
+    _, sink = mock_services
+    emails_before = sink.count
+
+    first = asyncio.run(pipeline.run_pipeline(SAMPLE_RESUME, jd_profile, "repeat@example.com"))
+    second = asyncio.run(pipeline.run_pipeline(SAMPLE_RESUME, jd_profile, "repeat@example.com"))
+
+    assert first["email_sent"] is True
+    assert second.get("cached") is True
+    assert second["youtube_links"] == first["youtube_links"]
+    # The texts the email node generated are stored with the run
+    assert first["cover_letter"] and second["cover_letter"] == first["cover_letter"]
+    assert first["qa_guide"] and second["qa_guide"] == first["qa_guide"]
+    assert second["email_sent"] is False
+    assert sink.count == emails_before + 1
+
+
+def test_failed_generation_sends_nothing_and_leaves_the_retry_open(pipeline, jd_profile, mock_services, monkeypatch):
+    import email_agent
+    _, sink = mock_services
+    emails_before = sink.count
+
+    async def shed(resume_text, jd_profile):
+        raise RuntimeError("shed")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(email_agent, "agenerate_qa_guide", shed)
+        failed = asyncio.run(pipeline.run_pipeline(SAMPLE_RESUME, jd_profile, "retry@example.com"))
+    assert failed["email_sent"] is False
+    assert sink.count == emails_before
+
+    retried = asyncio.run(pipeline.run_pipeline(SAMPLE_RESUME, jd_profile, "retry@example.com"))
+    assert retried["email_sent"] is True
+    assert sink.count == emails_before + 1
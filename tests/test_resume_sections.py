@@ -0,0 +1,52 @@
+from resume_sections import segment_resume, prose_chunks
+
+from load_test import SAMPLE_RESUME
+
+
+def test_prose_chunks_skip_skill_lists_when_the_resume_has_sections():
+    chunks = prose_chunks(segment_resume(SAMPLE_RESUME))
+    assert any("reporting pipelines" in chunk for chunk in chunks)
+    assert not any("tableau" in chunk for chunk in chunks)
+
+
+def test_headingless_resume_is_chunked_as_a_whole():
+    text = ("Jane Doe\n"
+            "Built NLP pipelines with transformers to route support tickets.\n"
+            "Trained convolutional models on product images.")
+    sections = segment_resume(text)
+    assert list(sections) == ["header"]
+    assert prose_chunks(sections) == [
+        "built nlp pipelines with transformers to route support tickets",
+        "trained convolutional models on product images",
+    ]
+
+
+def test_one_skill_per_line_list_keeps_its_acronyms():
+    text = ("Jane Doe\n"
+            "TECHNICAL SKILLS\n"
+            "Python\nSQL\nNLP\nJava\n"
+            "EDUCATION\n"
+            "B.Sc. Statistics, 2019\n")
+    sections = segment_resume(text)
+    assert sections["skills"].splitlines() == ["Python", "SQL", "NLP", "Java"]
+    assert "Statistics" in sections["education"]
+
+
+def test_unknown_caps_heading_keeps_its_text():
+    text = "EXPERIENCE\nBuilt dashboards for leadership.\nVOLUNTEERING\nTaught Python at a local school.\n"
+    sections = segment_resume(text)
+    assert sections["other"].splitlines() == ["VOLUNTEERING", "Taught Python at a local school."]
+
+
+def test_inline_label_in_a_job_entry_does_not_end_the_entry():
+    text = ("EXPERIENCE\n"
+            "Data Engineer, Acme\n"
+            "Tech stack: Python, Spark\n"
+            "• Built streaming ingestion for clickstream events.\n"
+            "• Cut warehouse costs by a third with partition pruning.\n"
+            "SKILLS: Docker, Airflow\n"
+            "Kubernetes\n")
+    sections = segment_resume(text)
+    assert sections["skills"].splitlines() == ["Python, Spark", "Docker, Airflow", "Kubernetes"]
+    assert "partition pruning" in sections["experience"]
+    assert any("streaming ingestion" in chunk for chunk in prose_chunks(sections))
@@ -0,0 +1,61 @@
+import asyncio
+
+import run_store
+
+
+def test_coalesce_shares_one_execution_between_identical_runs():
+    calls = []
+
+    async def run():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return {"score": 50.0}
+
+    async def both():
+        return await asyncio.gather(run_store.coalesce("k-coalesce", run), run_store.coalesce("k-coalesce", run))
+
+    assert asyncio.run(both()) == [{"score": 50.0}, {"score": 50.0}]
+    assert calls == [1]
+
+
+def test_claimed_run_is_awaited_by_later_callers():
+    assert run_store.claim_run("k-claimed") is None
+    waiter = run_store.claim_run("k-claimed")
+    assert waiter is not None and not waiter.done()
+
+    async def owner():
+        return {"score": 75.0}
+
+    assert asyncio.run(run_store.coalesce("k-claimed", owner, claimed=True)) == {"score": 75.0}
+    assert waiter.result(timeout=1) == {"score": 75.0}
+    assert run_store.claim_run("k-claimed") is None  # finished, so a new run may start
+    run_store.finish_run("k-claimed")
+
+
+def test_failed_owner_releases_waiters_with_its_error():
+    assert run_store.claim_run("k-failed") is None
+    waiter = run_store.claim_run("k-failed")
+    run_store.finish_run("k-failed", error=RuntimeError("stream interrupted"))
+    assert isinstance(waiter.exception(timeout=1), RuntimeError)
+    run_store.finish_run("k-failed")  # idempotent
+
+
+def test_results_round_trip_including_texts():
+    output = {"score": 80.0, "missing_skills": ["NLP"], "youtube_links": ["x"],
+              "cover_letter": "Dear Hiring Manager", "qa_guide": "Q1: Why?", "timings": {"email": 1.0}}
+    run_store.save_result("k-saved", output)
+    cached = run_store.get_result("k-saved")
+    assert cached == {k: output[k] for k in run_store.CACHED_KEYS if k in output}
+    assert run_store.get_result("k-saved", max_age=-1) is None
+
+
+def test_degraded_suggestions_are_not_cached():
+    run_store.save_result("k-degraded", {"score": 80.0, "youtube_links": ["fallback"], "youtube_degraded": True})
+    assert run_store.get_result("k-degraded") is None
+
+
+def test_email_is_claimed_once_per_window():
+    assert run_store.claim_email("k-email") is True
+    assert run_store.claim_email("k-email") is False
+    run_store.release_email_claim("k-email")
+    assert run_store.claim_email("k-email") is True
@@ -1,34 +1,39 @@
 # youtube video suggestions for upskill the missing skills
 import os
-import requests
+import asyncio
+import contextvars
+from contextlib import asynccontextmanager
+import httpx
 from dotenv import load_dotenv
 import re
+import time
+from urllib.parse import quote_plus
+import document_store
+import providers
+from llm_scheduler import scheduler, current_request, RequestShed
 
 # Load API key from .env
 load_dotenv()
-GROQ_API_KEY = os.getenv("GROQ_API_KEY")
 
-API_URL = "https://api.groq.com/openai/v1/chat/completions"
+# Endpoint and key come from the provider layer (GROQ_API_BASE / OFFLINE_MODE)
+API_URL = providers.chat_completions_url()
 MODEL_NAME = "llama-3.1-8b-instant"
 
-headers = {
-    "Authorization": f"Bearer {GROQ_API_KEY}",
-    "Content-Type": "application/json"
-}
+headers = providers.groq_headers()
 
-def youtube_utility(state):
-    missing_skills = state.get("missing_skills", [])
-    
-    if not missing_skills or not isinstance(missing_skills, list):
-        return {
-            **state,
-            "youtube_links": ["🎉 Congratulations! You have all the required skills for this job."]
-        }
+# Past the deadline the step degrades to cached suggestions instead of waiting on Groq
+YOUTUBE_DEADLINE_S = float(os.getenv("YOUTUBE_DEADLINE_S", "15"))
+
+ALL_SKILLS_PRESENT = ["🎉 Congratulations! You have all the required skills for this job."]
 
+def build_payload(missing_skills, jd_profile=None):
     skills_str = ', '.join(missing_skills)
+    # Target the videos at the role from the cached JD profile when it is known
+    role = (jd_profile or {}).get("title")
+    role_str = f" preparing for a {role} role" if role else ""
 
     prompt = (
-        f"You are an AI assistant. For each of the following skills, suggest 1 to 2 high-quality YouTube videos to help someone upskill: {skills_str}.\n\n"
+        f"You are an AI assistant. For each of the following skills, suggest 1 to 2 high-quality YouTube videos to help someone{role_str} upskill: {skills_str}.\n\n"
         "Format the output exactly like this for each skill:\n"
         "Skill: SkillName\n"
         "- [Video Title](https://youtube.com/...) - Channel: Channel Name\n"
@@ -36,7 +41,7 @@ def youtube_utility(state):
         "Only return the list in Markdown format. No explanations or extra text."
     )
 
-    payload = {
+    return {
         "model": MODEL_NAME,
         "messages": [
             {"role": "system", "content": "You are a helpful assistant that suggests YouTube learning resources."},
@@ -45,37 +50,120 @@ def youtube_utility(state):
         "temperature": 0.7
     }
 
-    response = requests.post(API_URL, headers=headers, json=payload, timeout=25)
+def parse_suggestions(content):
+    lines = content.strip().splitlines()
+
+    youtube_links = []
+    current_skill = ""
 
-    if response.status_code == 200:
-        content = response.json()['choices'][0]['message']['content'].strip()
-        lines = content.splitlines()
+    for line in lines:
+        skill_header = re.match(r'^Skill:\s*(.+)', line)
+        video_match = re.search(r'\[(.*?)\]\((https?://.*?)\)\s*-\s*Channel:\s*(.+)', line)
 
-        youtube_links = []
-        current_skill = ""
+        if skill_header:
+            current_skill = f"**🧠 Skill: {skill_header.group(1).strip()}**"
+            youtube_links.append(current_skill)
+        elif video_match:
+            title = video_match.group(1).strip()
+            url = video_match.group(2).strip()
+            channel = video_match.group(3).strip()
+            youtube_links.append(f"- [{title}]({url}) — 🎥 Channel: **{channel}**")
+        elif line.strip():
+            youtube_links.append(line.strip())
 
-        for line in lines:
-            skill_header = re.match(r'^Skill:\s*(.+)', line)
-            video_match = re.search(r'\[(.*?)\]\((https?://.*?)\)\s*-\s*Channel:\s*(.+)', line)
+    return youtube_links
+
+# ------------------------ Suggestion cache (shedding fallback) ------------------------
+
+_suggestion_cache = {}
+
+def remember_suggestions(youtube_links):
+    skill = None
+    for line in youtube_links:
+        header = re.match(r'^\*\*🧠 Skill: (.+)\*\*$', line)
+        if header:
+            skill = header.group(1).strip().lower()
+            _suggestion_cache[skill] = []
+        elif skill is not None and line.startswith("- "):
+            _suggestion_cache[skill].append(line)
+
+def cached_suggestions(missing_skills):
+    youtube_links = []
+    for skill in missing_skills:
+        youtube_links.append(f"**🧠 Skill: {skill}**")
+        cached = _suggestion_cache.get(skill.lower())
+        if cached:
+            youtube_links.extend(cached)
+        else:
+            youtube_links.append(f"- [Search YouTube: {skill} tutorial](https://www.youtube.com/results?search_query={quote_plus(skill + ' tutorial')})")
+    return youtube_links
+
+def fallback_suggestions(missing_skills):
+    return {
+        "youtube_links": cached_suggestions(missing_skills),
+        "youtube_degraded": True
+    }
 
-            if skill_header:
-                current_skill = f"**🧠 Skill: {skill_header.group(1).strip()}**"
-                youtube_links.append(current_skill)
-            elif video_match:
-                title = video_match.group(1).strip()
-                url = video_match.group(2).strip()
-                channel = video_match.group(3).strip()
-                youtube_links.append(f"- [{title}]({url}) — 🎥 Channel: **{channel}**")
-            elif line.strip():
-                youtube_links.append(line.strip())
+def step_deadline():
+    deadline = time.monotonic() + YOUTUBE_DEADLINE_S
+    requested = current_request().deadline
+    return deadline if requested is None else min(deadline, requested)
 
+def handle_response(status_code, payload):
+    if status_code == 200:
+        youtube_links = parse_suggestions(payload['choices'][0]['message']['content'])
+        remember_suggestions(youtube_links)
         return {
-            **state,
             "youtube_links": youtube_links
         }
 
     else:
         return {
-            **state,
-            "youtube_links": [f"❌ Error fetching suggestions: {response.status_code}"]
+            "youtube_links": [f"❌ Error fetching suggestions: {status_code}"],
+            "youtube_degraded": True
         }
+
+# Pooled client for the current run (or batch of runs), closed when it ends so no
+# sockets outlive their event loop (each Streamlit run uses asyncio.run)
+_http_client = contextvars.ContextVar("youtube_http_client", default=None)
+
+@asynccontextmanager
+async def http_client():
+    """Opens a client for the block; nested blocks reuse the outer one."""
+    client = _http_client.get()
+    if client is not None:
+        yield client
+        return
+    async with httpx.AsyncClient(timeout=25) as client:
+        token = _http_client.set(client)
+        try:
+            yield client
+        finally:
+            _http_client.reset(token)
+
+async def youtube_utility_async(state):
+    missing_skills = state.get("missing_skills", [])
+
+    if not missing_skills or not isinstance(missing_skills, list):
+        return {
+            "youtube_links": ALL_SKILLS_PRESENT
+        }
+
+    deadline = step_deadline()
+    try:
+        async with http_client() as client, scheduler.slot(MODEL_NAME, deadline=deadline):
+            # The deadline bounds the call itself too, not just the wait in the queue
+            remaining = max(0.1, deadline - time.monotonic())
+            response = await client.post(API_URL, headers=headers, json=build_payload(missing_skills, document_store.get(state.get("jd_id"))), timeout=remaining)
+    except (RequestShed, httpx.TransportError):  # includes httpx timeouts
+        return fallback_suggestions(missing_skills)
+
+    # Rate limited: degrade rather than show an error
+    if response.status_code == 429:
+        return fallback_suggestions(missing_skills)
+
+    return handle_response(response.status_code, response.json() if response.status_code == 200 else None)
+
+# Sync entry point for callers outside an event loop
+def youtube_utility(state):
+    return asyncio.run(youtube_utility_async(state))